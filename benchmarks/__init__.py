@@ -0,0 +1,13 @@
+from .runner import ScenarioResult, percentile, run_scenario
+from .scenarios import BenchmarkContext, Scenario, SCENARIOS, select_scenarios
+
+
+__all__ = [
+    'ScenarioResult',
+    'percentile',
+    'run_scenario',
+    'BenchmarkContext',
+    'Scenario',
+    'SCENARIOS',
+    'select_scenarios'
+]
@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import httpx
+from .runner import run_scenario
+from .scenarios import BenchmarkContext, select_scenarios
+
+
+COMPARED_METRICS = ('rps', 'p50_ms', 'p95_ms', 'p99_ms')
+RATE_LIMIT_VARIABLES = (
+    'RATE_LIMIT_SHORTEN_IP',
+    'RATE_LIMIT_SHORTEN_USER',
+    'RATE_LIMIT_SHORTEN_ROUTE',
+    'RATE_LIMIT_SHORTEN_BATCH_IP',
+    'RATE_LIMIT_SHORTEN_BATCH_USER',
+    'RATE_LIMIT_SHORTEN_BATCH_ROUTE'
+)
+
+
+def git_commit() -> str | None:
+    """
+    Возвращает текущий коммит репозитория, если он доступен.
+
+    Returns
+    -------
+    str | None
+        Хэш коммита или None.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_fake_redis() -> None:
+    """
+    Подменяет клиент Redis приложения на fakeredis в памяти процесса.
+    """
+    import fakeredis
+    import url_shortener.app as app_module
+
+    app_module.aioredis = SimpleNamespace(
+        from_url=lambda *args, **kwargs: fakeredis.FakeAsyncRedis()
+    )
+
+
+def disable_rate_limits() -> None:
+    """
+    Отключает ограничения частоты запросов приложения.
+
+    Все запросы прогона идут с одного адреса от одного пользователя, поэтому
+    с ограничениями по умолчанию почти все запросы создания получали бы 429.
+    Вызывается до импорта конфигурации приложения.
+    """
+    for variable in RATE_LIMIT_VARIABLES:
+        os.environ[variable] = ''
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    """
+    Запускает приложение в процессе и прогоняет выбранные сценарии.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Аргументы командной строки.
+
+    Returns
+    -------
+    dict
+        Описание прогона и результаты сценариев.
+    """
+    scenarios = select_scenarios(args.scenarios)
+
+    if not args.rate_limits:
+        disable_rate_limits()
+    if args.redis == 'fake':
+        use_fake_redis()
+
+    from url_shortener.app import app
+    from url_shortener.db import create_db_and_tables
+
+    if args.create_tables:
+        await create_db_and_tables()
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+            context = BenchmarkContext(client)
+            await context.authenticate()
+
+            for name, scenario in scenarios.items():
+                request = await scenario.prepare(context, args.requests)
+                result = await run_scenario(
+                    client,
+                    request,
+                    args.requests,
+                    args.concurrency,
+                    scenario.expected_status
+                )
+                results[name] = result.to_dict()
+                print(
+                    f'{name:<20} {result.rps:>10.1f} rps  '
+                    f'p50 {result.p50_ms:>8.2f} ms  p95 {result.p95_ms:>8.2f} ms  '
+                    f'p99 {result.p99_ms:>8.2f} ms  errors {result.errors}',
+                    file=sys.stderr
+                )
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'redis': args.redis,
+            'rate_limits': args.rate_limits
+        },
+        'scenarios': results
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """
+    Выводит относительные изменения метрик по сравнению с базовым прогоном.
+
+    Parameters
+    ----------
+    report : dict
+        Текущий прогон.
+    baseline : dict
+        Базовый прогон.
+    """
+    for name, result in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+
+        changes = []
+        for metric in COMPARED_METRICS:
+            if previous[metric]:
+                change = (result[metric] - previous[metric]) / previous[metric] * 100
+                changes.append(f'{metric} {change:+.1f}%')
+        print(f"{name:<20} {'  '.join(changes)}", file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Точка входа `python -m benchmarks`.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        Аргументы командной строки, по умолчанию `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--requests', type=int, default=1000, help='Запросов на сценарий.')
+    parser.add_argument('--concurrency', type=int, default=50, help='Одновременных запросов.')
+    parser.add_argument('--scenarios', help='Сценарии через запятую, по умолчанию все.')
+    parser.add_argument('--redis', choices=('local', 'fake'), default='local',
+                        help="'local' — Redis из REDIS_HOST_CACHE, 'fake' — fakeredis в памяти.")
+    parser.add_argument('--rate-limits', action=argparse.BooleanOptionalAction, default=False,
+                        help='Оставить ограничения частоты запросов RATE_LIMIT_*, по умолчанию отключены.')
+    parser.add_argument('--create-tables', action='store_true',
+                        help='Создать таблицы в пустой базе данных перед прогоном.')
+    parser.add_argument('--output', help='Файл для результатов в формате JSON, по умолчанию stdout.')
+    parser.add_argument('--baseline', help='JSON предыдущего прогона для сравнения.')
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(benchmark(args))
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            compare(report, json.load(baseline_file))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
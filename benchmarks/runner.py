@@ -0,0 +1,115 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Awaitable, Callable
+import httpx
+
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentile(samples: list[float], share: float) -> float:
+    """
+    Вычисляет перцентиль выборки методом ближайшего ранга.
+
+    Parameters
+    ----------
+    samples : list[float]
+        Отсортированная по возрастанию выборка.
+    share : float
+        Доля от 0 до 1, например 0.95 для p95.
+
+    Returns
+    -------
+    float
+        Значение перцентиля или 0 для пустой выборки.
+    """
+    if not samples:
+        return 0.0
+
+    rank = max(math.ceil(share * len(samples)), 1)
+    return samples[rank - 1]
+
+
+@dataclass
+class ScenarioResult:
+    """
+    Результат прогона сценария нагрузки.
+    """
+
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    statuses: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    request: Request,
+    requests: int,
+    concurrency: int,
+    expected_status: int
+) -> ScenarioResult:
+    """
+    Выполняет `requests` запросов сценария в `concurrency` параллельных потоков.
+
+    Parameters
+    ----------
+    client : httpx.AsyncClient
+        HTTP-клиент приложения.
+    request : Request
+        Функция, выполняющая i-й запрос сценария.
+    requests : int
+        Общее количество запросов.
+    concurrency : int
+        Количество одновременно выполняемых запросов.
+    expected_status : int
+        Ожидаемый код ответа, остальные считаются ошибками.
+
+    Returns
+    -------
+    ScenarioResult
+        Задержки, пропускная способность и распределение кодов ответа.
+    """
+    latencies = []
+    statuses = {}
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for number in counter:
+            started_at = time.perf_counter()
+            response = await request(client, number)
+            latencies.append(time.perf_counter() - started_at)
+
+            code = str(response.status_code)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started_at
+
+    latencies.sort()
+    latencies_ms = [latency * 1000 for latency in latencies]
+
+    return ScenarioResult(
+        requests=requests,
+        errors=requests - statuses.get(str(expected_status), 0),
+        seconds=round(seconds, 3),
+        rps=round(requests / seconds, 1) if seconds else 0.0,
+        mean_ms=round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+        p50_ms=round(percentile(latencies_ms, 0.50), 3),
+        p95_ms=round(percentile(latencies_ms, 0.95), 3),
+        p99_ms=round(percentile(latencies_ms, 0.99), 3),
+        max_ms=round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+        statuses=statuses
+    )
@@ -0,0 +1,278 @@
+import json
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+import httpx
+from .runner import Request
+
+
+@dataclass
+class BenchmarkContext:
+    """
+    Общее состояние прогона: клиент, токен пользователя и созданные алиасы.
+    """
+
+    client: httpx.AsyncClient
+    run_id: str = field(default_factory=lambda: uuid4().hex[:8])
+    headers: dict = field(default_factory=dict)
+
+    @property
+    def project_name(self) -> str:
+        return f'bench-{self.run_id}'
+
+    async def authenticate(self) -> None:
+        """
+        Регистрирует пользователя прогона и получает для него JWT.
+        """
+        credentials = {
+            'email': f'bench-{self.run_id}@example.com',
+            'password': f'bench-{self.run_id}'
+        }
+        response = await self.client.post('/auth/register', json=credentials)
+        response.raise_for_status()
+
+        response = await self.client.post(
+            '/auth/jwt/login',
+            data={'username': credentials['email'], 'password': credentials['password']}
+        )
+        response.raise_for_status()
+        self.headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+    async def create_links(
+        self,
+        count: int,
+        tag: str,
+        owned: bool = False,
+        project: bool = False
+    ) -> list[str]:
+        """
+        Создает короткие URL одним пакетным запросом.
+
+        Parameters
+        ----------
+        count : int
+            Количество URL.
+        tag : str
+            Метка сценария для оригинальных URL.
+        owned : bool, optional
+            Создавать ли URL от имени пользователя прогона.
+        project : bool, optional
+            Добавлять ли URL в проект прогона.
+
+        Returns
+        -------
+        list[str]
+            Алиасы созданных URL.
+        """
+        items = [
+            {
+                'url': f'https://example.com/{self.run_id}/{tag}/{number}',
+                'project_name': self.project_name if project else None
+            }
+            for number in range(count)
+        ]
+        response = await self.client.post(
+            '/links/shorten/batch',
+            content='\n'.join(json.dumps(item) for item in items),
+            headers={
+                'Content-Type': 'application/x-ndjson',
+                **(self.headers if owned else {})
+            }
+        )
+        response.raise_for_status()
+
+        results = [json.loads(line) for line in response.text.splitlines() if line]
+        failed = [result for result in results if result['status'] != 201]
+        if failed:
+            raise RuntimeError(f'Failed to create benchmark links: {failed[:3]}')
+
+        return [result['alias'] for result in results]
+
+    async def forget_links(self, aliases: list[str]) -> None:
+        """
+        Удаляет URL из кэша Redis и кэша процесса, куда их кладет создание.
+
+        Parameters
+        ----------
+        aliases : list[str]
+            Алиасы коротких URL.
+        """
+        # Приложение импортируется после настройки окружения прогона.
+        from fastapi_cache import FastAPICache
+        from url_shortener.utils import alias_key, url_cache
+
+        redis = FastAPICache\
+            .get_backend()\
+            .redis
+        for start in range(0, len(aliases), 1000):
+            await redis.unlink(*(alias_key(alias) for alias in aliases[start:start + 1000]))
+        for alias in aliases:
+            url_cache.invalidate(alias)
+
+
+@dataclass
+class Scenario:
+    """
+    Сценарий нагрузки: подготовка данных, запрос и ожидаемый код ответа.
+    """
+
+    expected_status: int
+    prepare: Callable[[BenchmarkContext, int], Awaitable[Request]]
+    description: str
+
+
+def pool_size(requests: int) -> int:
+    return max(min(requests, 100), 1)
+
+
+async def prepare_shorten_generated(context: BenchmarkContext, requests: int) -> Request:
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.post(
+            '/links/shorten',
+            json={'url': f'https://example.com/{context.run_id}/generated/{number}'}
+        )
+
+    return request
+
+
+async def prepare_shorten_custom(context: BenchmarkContext, requests: int) -> Request:
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.post(
+            '/links/shorten',
+            json={
+                'url': f'https://example.com/{context.run_id}/custom/{number}',
+                'alias': f'b{context.run_id}c{number}'
+            }
+        )
+
+    return request
+
+
+async def prepare_redirect_hit(context: BenchmarkContext, requests: int) -> Request:
+    aliases = await context.create_links(pool_size(requests), 'hit')
+    for alias in aliases:
+        await context.client.get(f'/links/{alias}')
+
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.get(f'/links/{aliases[number % len(aliases)]}')
+
+    return request
+
+
+async def prepare_redirect_miss(context: BenchmarkContext, requests: int) -> Request:
+    # Каждый алиас запрашивается один раз, а кэш, заполненный при создании,
+    # очищается, поэтому ни один запрос не попадает в кэш.
+    aliases = await context.create_links(requests, 'miss')
+    await context.forget_links(aliases)
+
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.get(f'/links/{aliases[number]}')
+
+    return request
+
+
+async def prepare_redirect_not_found(context: BenchmarkContext, requests: int) -> Request:
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.get(f'/links/b{context.run_id}missing{number}')
+
+    return request
+
+
+async def prepare_update(context: BenchmarkContext, requests: int) -> Request:
+    aliases = await context.create_links(pool_size(requests), 'update', owned=True)
+
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.put(
+            f'/links/{aliases[number % len(aliases)]}',
+            json={'update_url': f'https://example.org/{context.run_id}/{number}'},
+            headers=context.headers
+        )
+
+    return request
+
+
+async def prepare_stats(context: BenchmarkContext, requests: int) -> Request:
+    aliases = await context.create_links(pool_size(requests), 'stats', owned=True)
+
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.get(
+            f'/links/{aliases[number % len(aliases)]}/stats',
+            headers=context.headers
+        )
+
+    return request
+
+
+async def prepare_stats_timeseries(context: BenchmarkContext, requests: int) -> Request:
+    aliases = await context.create_links(pool_size(requests), 'timeseries', owned=True)
+
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.get(
+            f'/links/{aliases[number % len(aliases)]}/stats',
+            params={'granularity': 'hour'},
+            headers=context.headers
+        )
+
+    return request
+
+
+async def prepare_project(context: BenchmarkContext, requests: int) -> Request:
+    await context.create_links(pool_size(requests), 'project', owned=True, project=True)
+
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.get(
+            f'/links/projects/{context.project_name}',
+            params={'limit': 100},
+            headers=context.headers
+        )
+
+    return request
+
+
+async def prepare_delete(context: BenchmarkContext, requests: int) -> Request:
+    aliases = await context.create_links(requests, 'delete', owned=True)
+
+    async def request(client: httpx.AsyncClient, number: int) -> httpx.Response:
+        return await client.delete(f'/links/delete/{aliases[number]}', headers=context.headers)
+
+    return request
+
+
+# Порядок важен: удаление выполняется последним.
+SCENARIOS = {
+    'shorten_generated': Scenario(201, prepare_shorten_generated, 'POST /links/shorten со сгенерированным алиасом'),
+    'shorten_custom': Scenario(201, prepare_shorten_custom, 'POST /links/shorten с собственным алиасом'),
+    'redirect_hit': Scenario(307, prepare_redirect_hit, 'GET /links/{alias}, алиас в кэше'),
+    'redirect_miss': Scenario(307, prepare_redirect_miss, 'GET /links/{alias}, алиас не в кэше'),
+    'redirect_not_found': Scenario(404, prepare_redirect_not_found, 'GET /links/{alias}, алиас не существует'),
+    'update': Scenario(200, prepare_update, 'PUT /links/{alias}'),
+    'stats': Scenario(200, prepare_stats, 'GET /links/{alias}/stats'),
+    'stats_timeseries': Scenario(200, prepare_stats_timeseries, 'GET /links/{alias}/stats?granularity=hour'),
+    'project': Scenario(200, prepare_project, 'GET /links/projects/{project_name}'),
+    'delete': Scenario(204, prepare_delete, 'DELETE /links/delete/{alias}')
+}
+
+
+def select_scenarios(names: Optional[str]) -> dict[str, Scenario]:
+    """
+    Выбирает сценарии по списку имен через запятую с сохранением порядка.
+
+    Parameters
+    ----------
+    names : Optional[str]
+        Имена сценариев, по умолчанию все сценарии.
+
+    Returns
+    -------
+    dict[str, Scenario]
+        Выбранные сценарии.
+    """
+    if not names:
+        return dict(SCENARIOS)
+
+    requested = {name.strip() for name in names.split(',') if name.strip()}
+    unknown = requested - SCENARIOS.keys()
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}.")
+
+    return {name: scenario for name, scenario in SCENARIOS.items() if name in requested}
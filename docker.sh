@@ -1,9 +1,9 @@
 #!/bin/bash
 
-alembic upgrade head
+ROLE=${SERVICE_ROLE:-web}
 
-celery -A url_shortener.celery_app.celery_app:celery worker &
-gunicorn url_shortener.app:app \
-    --workers 1 \
-    --worker-class uvicorn.workers.UvicornWorker \
-    --bind=0.0.0.0:8000
\ No newline at end of file
+if [ "$ROLE" = "web" ]; then
+    alembic upgrade head
+fi
+
+exec python -m url_shortener.serve "$ROLE"
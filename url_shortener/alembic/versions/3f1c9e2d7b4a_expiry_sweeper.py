@@ -0,0 +1,47 @@
+"""Expiry sweeper
+
+Revision ID: 3f1c9e2d7b4a
+Revises: aabcf0be9cfb
+Create Date: 2025-04-02 19:41:27.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9e2d7b4a'
+down_revision: Union[str, None] = 'aabcf0be9cfb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индекс строится без блокировки записи в таблицу, а CREATE INDEX CONCURRENTLY
+    # не выполняется внутри транзакции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_current_urls_expire_at'),
+            'current_urls',
+            ['expire_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+    op.drop_column('current_urls', 'celery_task_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('current_urls', sa.Column('celery_task_id', sa.String(length=255), server_default='', nullable=False))
+    op.alter_column('current_urls', 'celery_task_id', server_default=None)
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_current_urls_expire_at'),
+            table_name='current_urls',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,28 @@
+"""Alias block sequence
+
+Revision ID: 8d2e4a6b1c3f
+Revises: 3f1c9e2d7b4a
+Create Date: 2025-04-05 14:12:53.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4a6b1c3f'
+down_revision: Union[str, None] = '3f1c9e2d7b4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('alias_block_seq')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.schema.DropSequence(sa.Sequence('alias_block_seq')))
@@ -0,0 +1,82 @@
+"""Partition deleted urls
+
+Revision ID: a7c3e9d51f26
+Revises: e2a6d4f81b37
+Create Date: 2025-04-12 17:03:41.552810
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import fastapi_users_db_sqlalchemy
+
+from url_shortener.db.partitions import next_month, partition_name
+from url_shortener.config import DELETED_URLS_PARTITIONS_AHEAD
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9d51f26'
+down_revision: Union[str, None] = 'e2a6d4f81b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Существующая таблица без копирования данных становится секцией
+    # со всеми строками до конца текущего месяца.
+    op.rename_table('deleted_urls', 'deleted_urls_legacy')
+    op.drop_constraint('deleted_urls_pkey', 'deleted_urls_legacy', type_='primary')
+    op.drop_constraint('deleted_urls_user_id_fkey', 'deleted_urls_legacy', type_='foreignkey')
+    op.alter_column('deleted_urls_legacy', 'id', server_default=None)
+
+    op.create_table('deleted_urls',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('deleted_urls_id_seq'::regclass)"), nullable=False),
+    sa.Column('user_id', fastapi_users_db_sqlalchemy.generics.GUID(), nullable=True),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('alias', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expired_at', sa.DateTime(), nullable=False),
+    sa.Column('clicks_count', sa.Integer(), nullable=False),
+    sa.Column('last_clicked_at', sa.DateTime(), nullable=True),
+    sa.Column('project_name', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', 'expired_at'),
+    postgresql_partition_by='RANGE (expired_at)'
+    )
+    op.execute('ALTER SEQUENCE deleted_urls_id_seq OWNED BY deleted_urls.id')
+    op.create_index('ix_deleted_urls_user_id_id', 'deleted_urls', ['user_id', 'id'], unique=False)
+
+    start = next_month(datetime.now(timezone.utc).replace(tzinfo=None))
+    op.execute(
+        'ALTER TABLE deleted_urls ATTACH PARTITION deleted_urls_legacy '
+        f"FOR VALUES FROM (MINVALUE) TO ('{start.isoformat()}')"
+    )
+    for _ in range(DELETED_URLS_PARTITIONS_AHEAD):
+        end = next_month(start)
+        op.execute(
+            f'CREATE TABLE {partition_name(start)} PARTITION OF deleted_urls '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+    op.execute('CREATE TABLE deleted_urls_default PARTITION OF deleted_urls DEFAULT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('CREATE TABLE deleted_urls_plain (LIKE deleted_urls INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO deleted_urls_plain SELECT * FROM deleted_urls')
+    op.execute('ALTER SEQUENCE deleted_urls_id_seq OWNED BY deleted_urls_plain.id')
+    op.drop_table('deleted_urls')
+    op.rename_table('deleted_urls_plain', 'deleted_urls')
+    op.create_primary_key('deleted_urls_pkey', 'deleted_urls', ['id'])
+    op.create_foreign_key(
+        'deleted_urls_user_id_fkey',
+        'deleted_urls',
+        'user',
+        ['user_id'],
+        ['id'],
+        ondelete='SET NULL'
+    )
@@ -0,0 +1,44 @@
+"""Hot path indexes
+
+Revision ID: d4b8f2a6c913
+Revises: a7c3e9d51f26
+Create Date: 2025-04-13 11:26:08.734519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8f2a6c913'
+down_revision: Union[str, None] = 'a7c3e9d51f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индекс строится без блокировки записи в таблицу, а CREATE INDEX CONCURRENTLY
+    # не выполняется внутри транзакции. Прерванное построение оставляет
+    # невалидный индекс: его нужно удалить перед повторным запуском миграции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_current_urls_user_id_project_name_id',
+            'current_urls',
+            ['user_id', 'project_name', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_current_urls_user_id_project_name_id',
+            table_name='current_urls',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -3,14 +3,18 @@ from .auth import (
     fastapi_users,
     current_active_user,
     current_active_optional_user,
+    listen_user_invalidations,
     UserCreate,
     UserRead,
     UserUpdate
 )
+from .rate_limit import RateLimited
+from .sessions import pin_primary, is_pinned, get_read_session
 from .endpoints import (
     router_management,
     router_statistics
 )
+from .redirect import RedirectMiddleware
 
 
 __all__ = [
@@ -18,9 +22,15 @@ __all__ = [
     'fastapi_users',
     'current_active_user',
     'current_active_optional_user',
+    'listen_user_invalidations',
     'UserCreate',
     'UserRead',
     'UserUpdate',
+    'RateLimited',
+    'pin_primary',
+    'is_pinned',
+    'get_read_session',
     'router_management',
-    'router_statistics'
+    'router_statistics',
+    'RedirectMiddleware'
 ]
@@ -2,7 +2,13 @@ from .users import (
     auth_backend,
     fastapi_users,
     current_active_user,
-    current_active_optional_user
+    current_active_optional_user,
+    request_user_id
+)
+from .strategy import (
+    CachedJWTStrategy,
+    invalidate_user,
+    listen_user_invalidations
 )
 from .schemas import (
     UserCreate,
@@ -16,6 +22,10 @@ __all__ = [
     'fastapi_users',
     'current_active_user',
     'current_active_optional_user',
+    'request_user_id',
+    'CachedJWTStrategy',
+    'invalidate_user',
+    'listen_user_invalidations',
     'UserCreate',
     'UserRead',
     'UserUpdate'
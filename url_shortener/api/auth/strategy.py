@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+import jwt
+from fastapi_cache import FastAPICache
+from fastapi_users import BaseUserManager, exceptions, models
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy.orm import make_transient_to_detached
+from url_shortener.db import User
+from url_shortener.utils import LocalCache, MISSING
+from url_shortener.config import (
+    USER_CACHE_MAX_ENTRIES,
+    USER_CACHE_TTL,
+    USER_INVALIDATION_CHANNEL
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Токен -> ID пользователя из проверенных claims, негативные записи — недействительные токены.
+token_cache = LocalCache(
+    max_entries=USER_CACHE_MAX_ENTRIES,
+    max_bytes=USER_CACHE_MAX_ENTRIES * 1024,
+    ttl=USER_CACHE_TTL,
+    negative_ttl=USER_CACHE_TTL
+)
+# ID пользователя -> значения столбцов строки `user`.
+user_cache = LocalCache(
+    max_entries=USER_CACHE_MAX_ENTRIES,
+    max_bytes=USER_CACHE_MAX_ENTRIES * 1024,
+    ttl=USER_CACHE_TTL,
+    negative_ttl=USER_CACHE_TTL
+)
+
+USER_COLUMNS = tuple(attribute.key for attribute in User.__mapper__.column_attrs)
+
+
+def _restore_user(values: dict) -> User:
+    """
+    Создает экземпляр пользователя из закэшированных значений столбцов.
+
+    Экземпляр создается заново для каждого запроса и помечается как
+    отсоединенный от сессии, поэтому его изменение и сохранение через
+    `SQLAlchemyUserDatabase` выполняется через `UPDATE`.
+
+    Parameters
+    ----------
+    values : dict
+        Значения столбцов строки `user`.
+
+    Returns
+    -------
+    User
+        Отсоединенный экземпляр пользователя.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+class CachedJWTStrategy(JWTStrategy[models.UP, models.ID]):
+    """
+    Стратегия JWT с кэшем проверенных токенов и пользователей в памяти процесса.
+
+    Проверенные claims запоминаются до истечения токена, пользователи —
+    на `USER_CACHE_TTL` секунд или до явной инвалидации через
+    `invalidate_user`.
+    """
+
+    def read_user_id(self, token: str) -> Optional[str]:
+        """
+        Возвращает ID пользователя из проверенного токена.
+
+        Parameters
+        ----------
+        token : str
+            JWT из заголовка запроса.
+
+        Returns
+        -------
+        Optional[str]
+            ID пользователя или None, если токен недействителен.
+        """
+        user_id = token_cache.get(token)
+        if user_id is not MISSING:
+            return user_id
+
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+        except jwt.PyJWTError:
+            token_cache.set(token, None)
+            return None
+
+        user_id = data.get('sub')
+        expires_in = data['exp'] - time.time() if 'exp' in data else USER_CACHE_TTL
+        token_cache.set(token, user_id, ttl=max(expires_in, 0))
+
+        return user_id
+
+    async def read_token(
+        self,
+        token: Optional[str],
+        user_manager: BaseUserManager[models.UP, models.ID]
+    ) -> Optional[models.UP]:
+        """
+        Возвращает пользователя по токену.
+
+        Parameters
+        ----------
+        token : Optional[str]
+            JWT из заголовка запроса.
+        user_manager : BaseUserManager
+            Менеджер пользователей.
+
+        Returns
+        -------
+        Optional[models.UP]
+            Пользователь или None, если токен недействителен или пользователь
+            не найден.
+        """
+        if token is None:
+            return None
+
+        user_id = self.read_user_id(token)
+        if user_id is None:
+            return None
+
+        values = user_cache.get(user_id)
+        if values is not MISSING:
+            return _restore_user(values) if values is not None else None
+
+        try:
+            user = await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            user_cache.set(user_id, None)
+            return None
+
+        user_cache.set(user_id, {key: getattr(user, key) for key in USER_COLUMNS})
+        return user
+
+
+async def invalidate_user(user_id) -> None:
+    """
+    Удаляет пользователя из кэша во всех процессах приложения.
+
+    Ошибка Redis не прерывает запрос: изменения уже сохранены в базе данных,
+    а в других процессах пользователь истекает по сроку жизни кэша.
+
+    Parameters
+    ----------
+    user_id : UUID
+        ID пользователя.
+    """
+    user_cache.invalidate(str(user_id))
+
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    try:
+        await redis.publish(USER_INVALIDATION_CHANNEL, str(user_id))
+    except Exception:
+        logger.warning(f"Error publishing invalidation of user '{user_id}':", exc_info=True)
+
+
+async def listen_user_invalidations(redis) -> None:
+    """
+    Подписывается на канал инвалидации и удаляет пользователей из кэша процесса.
+
+    При потере соединения кэш пользователей очищается, так как часть
+    сообщений могла быть пропущена.
+
+    Parameters
+    ----------
+    redis : Redis
+        Асинхронный клиент Redis.
+    """
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(USER_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    user_cache.invalidate(message['data'].decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('User invalidation subscription failed.')
+            user_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.reset()
@@ -1,5 +1,5 @@
 import uuid
-from typing import Optional
+from typing import Any, Optional
 from fastapi import Depends, Request
 from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin, models
 from fastapi_users.authentication import (
@@ -10,6 +10,7 @@ from fastapi_users.authentication import (
 from fastapi_users.db import SQLAlchemyUserDatabase
 from url_shortener.db import get_user_db, User
 from url_shortener.config import AUTH_TOKEN
+from .strategy import CachedJWTStrategy, invalidate_user
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
@@ -63,6 +64,68 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
         """
         print(f'Verification requested for user {user.id}. Verification token: {token}')
 
+    async def on_after_update(
+        self, user: User, update_dict: dict[str, Any], request: Optional[Request] = None
+    ):
+        """
+        Вызывается после изменения пользователя, в том числе деактивации.
+
+        Parameters
+        ----------
+        user : User
+            Экземпляр пользователя.
+        update_dict : dict[str, Any]
+            Измененные поля пользователя.
+        request : Optional[Request], optional
+            Объект HTTP-запроса, по умолчанию None.
+        """
+        await invalidate_user(user.id)
+
+    async def on_after_verify(
+        self, user: User, request: Optional[Request] = None
+    ):
+        """
+        Вызывается после верификации email пользователя.
+
+        Parameters
+        ----------
+        user : User
+            Экземпляр пользователя.
+        request : Optional[Request], optional
+            Объект HTTP-запроса, по умолчанию None.
+        """
+        await invalidate_user(user.id)
+
+    async def on_after_reset_password(
+        self, user: User, request: Optional[Request] = None
+    ):
+        """
+        Вызывается после сброса пароля пользователя.
+
+        Parameters
+        ----------
+        user : User
+            Экземпляр пользователя.
+        request : Optional[Request], optional
+            Объект HTTP-запроса, по умолчанию None.
+        """
+        await invalidate_user(user.id)
+
+    async def on_after_delete(
+        self, user: User, request: Optional[Request] = None
+    ):
+        """
+        Вызывается после удаления пользователя.
+
+        Parameters
+        ----------
+        user : User
+            Экземпляр пользователя.
+        request : Optional[Request], optional
+            Объект HTTP-запроса, по умолчанию None.
+        """
+        await invalidate_user(user.id)
+
 
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
     """
@@ -85,12 +148,38 @@ def get_jwt_strategy() -> JWTStrategy[models.UP, models.ID]:
     """
     Возвращает стратегию JWT для аутентификации.
 
+    Проверенные токены и пользователи кэшируются в памяти процесса.
+
     Returns
     -------
     JWTStrategy
         Экземпляр стратегии JWT, настроенный с секретом и временем жизни токена.
     """
-    return JWTStrategy(secret=AUTH_TOKEN, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=AUTH_TOKEN, lifetime_seconds=3600)
+
+
+jwt_strategy = get_jwt_strategy()
+
+
+def request_user_id(request: Request) -> Optional[str]:
+    """
+    Возвращает ID пользователя из токена запроса без обращения к базе данных.
+
+    Parameters
+    ----------
+    request : Request
+        Объект HTTP-запроса.
+
+    Returns
+    -------
+    Optional[str]
+        ID пользователя или None для анонимного запроса и недействительного токена.
+    """
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+
+    return jwt_strategy.read_user_id(token)
 
 
 bearer_transport = BearerTransport(tokenUrl='auth/jwt/login')
@@ -1,35 +1,58 @@
+import json
+from collections.abc import AsyncIterator, Iterator
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from fastapi import APIRouter, HTTPException, status, Depends, Response
-from fastapi.responses import RedirectResponse
-from sqlalchemy import select, insert
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select, insert, true, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_cache.decorator import cache
-from celery.result import AsyncResult
 from url_shortener.api import (
     current_active_user,
-    current_active_optional_user
+    current_active_optional_user,
+    RateLimited,
+    pin_primary,
+    get_read_session
 )
-from url_shortener.celery_app import delete_expired_links
+from url_shortener.metrics import span
 from url_shortener.db import (
     User,
     CurrentURLs,
     DeletedURLs,
+    async_session,
     get_async_session
 )
+from url_shortener.db.models import LINK_LIFETIME
 from url_shortener.utils import (
-    generate_alias,
     search_url,
-    delete_redis_keys
+    url_fingerprint,
+    click_buffer,
+    resolve_url,
+    register_urls,
+    invalidate_url,
+    invalidate_urls,
+    alias_filter,
+    alias_generator,
+    link_keys,
+    link_versions,
+    cached,
+    search_key_builder
+)
+from url_shortener.config import (
+    ALIAS_ALLOCATION_ATTEMPTS,
+    BATCH_CHUNK_SIZE
 )
-from url_shortener.config import LIFETIME
 from .schemas import CreateURL, UpdateURL
 
 
 router_management = APIRouter()
 
 
-@router_management.post('/shorten')
+@router_management.post(
+    '/shorten',
+    dependencies=[Depends(RateLimited('shorten')), Depends(pin_primary)]
+)
 async def shorten(
     url: CreateURL,
     response: Response,
@@ -39,6 +62,11 @@ async def shorten(
     """
     Укорачивает URL и сохраняет его в базе данных.
 
+    В режиме `dedupe` для уже сокращенного с тем же режимом URL того же
+    владельца и проекта возвращается существующий алиас с кодом 200.
+    Одновременные запросы сводятся к одной строке уникальным частичным
+    индексом.
+
     Parameters
     ----------
     url : CreateURL
@@ -61,19 +89,6 @@ async def shorten(
             detail="Alias 'search' is not allowed! Try another one.",
         )
 
-    if url.alias is None:
-        alias = generate_alias(url.url)
-        while await search_url(session, url.alias):
-            alias = generate_alias
-        url.alias = alias
-
-    else:
-        if await search_url(session, url.alias):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Alias '{url.alias}' already exists! Try another one.",
-            )
-
     if not url.url.startswith('https'):
         url.url = 'https://' + url.url
 
@@ -84,35 +99,421 @@ async def shorten(
         .replace(tzinfo=None)\
         + timedelta(seconds=url.lifetime)
 
-    celery_task = delete_expired_links.apply_async(
-        args=[url.alias],
-        eta=expire_at,
-        expires=3600
-    )
+    url_hash = url_fingerprint(url.url)
+    is_generated = url.alias is None
+
+    # Уникальность алиаса и дедупликация проверяются индексами при вставке.
+    for _ in range(ALIAS_ALLOCATION_ATTEMPTS):
+        if is_generated:
+            with span('shorten.allocate'):
+                url.alias = await alias_generator.allocate(session, url.url)
+
+        query = pg_insert(CurrentURLs)\
+            .values(
+                url=url.url,
+                url_hash=url_hash,
+                alias=url.alias,
+                expire_at=expire_at,
+                user_id=user_id,
+                project_name=url.project_name,
+                dedupe=url.dedupe
+            )\
+            .on_conflict_do_nothing()\
+            .returning(CurrentURLs.alias)
+        with span('shorten.insert'):
+            query_result = await session.execute(query)
+            alias = query_result.scalar_one_or_none()
+
+            if alias is not None:
+                await session.commit()
+                break
+
+        await session.rollback()
+
+        if url.dedupe:
+            duplicates = await find_duplicates(session, user_id, [url_hash])
+            alias = duplicates.get((url_hash, url.project_name))
+            if alias is not None:
+                return {
+                    'status': 'URL is already shortened!',
+                    'original_url': url.url,
+                    'alias': alias
+                }
+
+        if not is_generated:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Alias '{url.alias}' already exists! Try another one.",
+            )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Failed to allocate a unique alias! Try again later.',
+        )
 
-    shorten_url = CurrentURLs(
-        url=url.url,
-        alias=url.alias,
-        expire_at=expire_at,
-        user_id=user_id,
-        project_name=url.project_name,
-        celery_task_id=celery_task.id
+    # Алиас мог быть закэширован как несуществующий.
+    await invalidate_url(
+        alias,
+        link_keys(alias, user_id, url.project_name, [url.url]),
+        link_versions(alias, user_id, url.project_name)
     )
-
-    session.add(shorten_url)
-    await session.commit()
-    await session.refresh(shorten_url)
+    await register_urls({alias: url.url})
 
     response.status_code = status.HTTP_201_CREATED
     return {
         'status': 'URL has been shortened!',
-        'original_url': shorten_url.url,
-        'alias': shorten_url.alias
+        'original_url': url.url,
+        'alias': alias
+    }
+
+
+async def find_duplicates(
+    session: AsyncSession,
+    user_id: Optional[str],
+    url_hashes: list[str]
+) -> dict[tuple[str, Optional[str]], str]:
+    """
+    Ищет живые дедуплицируемые короткие URL владельца по отпечаткам URL.
+
+    Parameters
+    ----------
+    session : AsyncSession
+        Асинхронная сессия базы данных.
+    user_id : Optional[str]
+        ID владельца URL.
+    url_hashes : list[str]
+        Отпечатки нормализованных URL.
+
+    Returns
+    -------
+    dict[tuple[str, Optional[str]], str]
+        Алиасы по отпечатку URL и названию проекта.
+    """
+    query = select(CurrentURLs.url_hash, CurrentURLs.project_name, CurrentURLs.alias)\
+        .where(
+            CurrentURLs.dedupe == true(),
+            CurrentURLs.url_hash == any_(
+                bindparam('url_hashes', url_hashes, type_=ARRAY(String))
+            ),
+            CurrentURLs.user_id.is_not_distinct_from(user_id)
+        )
+    query_result = await session.execute(query)
+
+    return {
+        (url_hash, project_name): alias
+        for url_hash, project_name, alias in query_result.all()
     }
 
 
+def parse_batch(body: bytes, content_type: str) -> Iterator[Any]:
+    """
+    Разбирает тело запроса пакетного сокращения URL.
+
+    Parameters
+    ----------
+    body : bytes
+        Тело запроса: JSON-массив или NDJSON.
+    content_type : str
+        Значение заголовка Content-Type.
+
+    Returns
+    -------
+    Iterator[Any]
+        Элементы пакета в порядке следования.
+    """
+    if 'ndjson' in content_type:
+        for line in body.splitlines():
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError('Request body must be a JSON array.')
+
+    yield from items
+
+
+async def insert_rows(
+    session: AsyncSession,
+    rows: dict[str, dict],
+    user_id: Optional[str]
+) -> set[str]:
+    """
+    Вставляет строки пачки одной вставкой и сбрасывает кэши вставленных алиасов.
+
+    Parameters
+    ----------
+    session : AsyncSession
+        Асинхронная сессия базы данных.
+    rows : dict[str, dict]
+        Строки `current_urls` с номером элемента в пакете по алиасам.
+    user_id : Optional[str]
+        ID текущего пользователя.
+
+    Returns
+    -------
+    set[str]
+        Вставленные алиасы. Строки с занятым алиасом или уже сокращенным
+        в режиме дедупликации URL пропускаются.
+    """
+    if not rows:
+        return set()
+
+    query = pg_insert(CurrentURLs)\
+        .values([
+            {key: value for key, value in row.items() if key != 'index'}
+            for row in rows.values()
+        ])\
+        .on_conflict_do_nothing()\
+        .returning(CurrentURLs.alias)
+    query_result = await session.execute(query)
+    inserted = set(query_result.scalars().all())
+    await session.commit()
+
+    await invalidate_urls(
+        list(inserted),
+        [
+            key
+            for alias in inserted
+            for key in link_keys(alias, user_id, rows[alias]['project_name'], [rows[alias]['url']])
+        ],
+        [
+            version
+            for alias in inserted
+            for version in link_versions(alias, user_id, rows[alias]['project_name'])
+        ]
+    )
+    await register_urls({alias: rows[alias]['url'] for alias in inserted})
+
+    return inserted
+
+
+async def shorten_chunk(
+    session: AsyncSession,
+    chunk: list[tuple[int, Any]],
+    user_id: Optional[str]
+) -> list[dict]:
+    """
+    Сокращает пачку URL одним запросом на проверку алиасов и одной вставкой.
+
+    Сгенерированные алиасы, оказавшиеся занятыми, выделяются заново
+    и вставляются повторно до `ALIAS_ALLOCATION_ATTEMPTS` раз.
+
+    Parameters
+    ----------
+    session : AsyncSession
+        Асинхронная сессия базы данных.
+    chunk : list[tuple[int, Any]]
+        Номера элементов в пакете и их данные.
+    user_id : Optional[str]
+        ID текущего пользователя.
+
+    Returns
+    -------
+    list[dict]
+        Результаты сокращения для каждого элемента пачки.
+    """
+    results = {}
+    urls = {}
+
+    for index, item in chunk:
+        try:
+            url = CreateURL.model_validate(item)
+        except ValidationError as error:
+            results[index] = {
+                'index': index,
+                'status': status.HTTP_422_UNPROCESSABLE_ENTITY,
+                'detail': error.errors(include_url=False, include_context=False)
+            }
+            continue
+
+        if url.alias == 'search':
+            results[index] = {
+                'index': index,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'detail': "Alias 'search' is not allowed! Try another one."
+            }
+            continue
+
+        if not url.url.startswith('https'):
+            url.url = 'https://' + url.url
+
+        urls[index] = url
+
+    # Алиасы, которых точно нет в фильтре, проверяются только при вставке.
+    custom_aliases = [
+        url.alias for url in urls.values()
+        if url.alias is not None and alias_filter.might_exist(url.alias)
+    ]
+    taken_aliases = set()
+    if custom_aliases:
+        query = select(CurrentURLs.alias).where(
+            CurrentURLs.alias == any_(
+                bindparam('aliases', custom_aliases, type_=ARRAY(String))
+            )
+        )
+        query_result = await session.execute(query)
+        taken_aliases.update(query_result.scalars().all())
+
+    now = datetime\
+        .now(timezone.utc)\
+        .replace(tzinfo=None)
+    url_hashes = {index: url_fingerprint(url.url) for index, url in urls.items()}
+    generated = {index for index, url in urls.items() if url.alias is None}
+    pending = list(urls)
+    conflicts = []
+
+    # Занятые сгенерированные алиасы выделяются заново, как в `shorten`:
+    # конфликт возвращается только для алиасов, переданных пользователем.
+    for _ in range(ALIAS_ALLOCATION_ATTEMPTS):
+        allocated = [index for index in pending if index in generated]
+        with span('shorten.allocate'):
+            aliases = await alias_generator.allocate_many(
+                session,
+                [urls[index].url for index in allocated]
+            )
+        for index, alias in zip(allocated, aliases):
+            urls[index].alias = alias
+
+        rows = {}
+        collisions = []
+        for index in pending:
+            url = urls[index]
+            if url.alias in taken_aliases:
+                (collisions if index in generated else conflicts).append(index)
+                continue
+
+            taken_aliases.add(url.alias)
+            rows[url.alias] = {
+                'index': index,
+                'url': url.url,
+                'url_hash': url_hashes[index],
+                'alias': url.alias,
+                'expire_at': now + timedelta(seconds=url.lifetime),
+                'user_id': user_id,
+                'project_name': url.project_name,
+                'dedupe': url.dedupe
+            }
+
+        inserted = await insert_rows(session, rows, user_id)
+        for alias, row in rows.items():
+            if alias in inserted:
+                results[row['index']] = {
+                    'index': row['index'],
+                    'status': status.HTTP_201_CREATED,
+                    'original_url': row['url'],
+                    'alias': alias
+                }
+            elif row['index'] in generated:
+                collisions.append(row['index'])
+            else:
+                conflicts.append(row['index'])
+
+        # Сгенерированный алиас в режиме дедупликации мог не вставиться
+        # из-за уже сокращенного URL, тогда повторять вставку не нужно.
+        deduped_hashes = {url_hashes[index] for index in collisions if urls[index].dedupe}
+        if deduped_hashes:
+            duplicates = await find_duplicates(session, user_id, list(deduped_hashes))
+            for index in collisions:
+                url = urls[index]
+                alias = duplicates.get((url_hashes[index], url.project_name)) if url.dedupe else None
+                if alias is not None:
+                    results[index] = {
+                        'index': index,
+                        'status': status.HTTP_200_OK,
+                        'original_url': url.url,
+                        'alias': alias
+                    }
+
+        pending = [index for index in collisions if index not in results]
+        if not pending:
+            break
+    else:
+        for index in pending:
+            results[index] = {
+                'index': index,
+                'status': status.HTTP_503_SERVICE_UNAVAILABLE,
+                'detail': 'Failed to allocate a unique alias! Try again later.'
+            }
+
+    # Конфликт в режиме дедупликации означает, что URL уже сокращен.
+    duplicates = {}
+    deduped_hashes = {url_hashes[index] for index in conflicts if urls[index].dedupe}
+    if deduped_hashes:
+        duplicates = await find_duplicates(session, user_id, list(deduped_hashes))
+
+    for index in conflicts:
+        url = urls[index]
+        alias = duplicates.get((url_hashes[index], url.project_name)) if url.dedupe else None
+
+        if alias is not None:
+            results[index] = {
+                'index': index,
+                'status': status.HTTP_200_OK,
+                'original_url': url.url,
+                'alias': alias
+            }
+        else:
+            results[index] = {
+                'index': index,
+                'status': status.HTTP_409_CONFLICT,
+                'detail': f"Alias '{url.alias}' already exists! Try another one."
+            }
+
+    return [results[index] for index, _ in chunk]
+
+
+@router_management.post(
+    '/shorten/batch',
+    dependencies=[Depends(RateLimited('shorten_batch')), Depends(pin_primary)]
+)
+async def shorten_batch(
+    request: Request,
+    user: Optional[User] = Depends(current_active_optional_user)
+):
+    """
+    Укорачивает пакет URL и построчно возвращает результаты в формате NDJSON.
+
+    Тело запроса принимается в виде JSON-массива или NDJSON с элементами
+    формата `CreateURL`. Элементы обрабатываются пачками по `BATCH_CHUNK_SIZE`,
+    каждая пачка сохраняется одной вставкой.
+
+    Parameters
+    ----------
+    request : Request
+        Объект HTTP-запроса.
+    user : Optional[User], optional
+        Текущий пользователь, по умолчанию None.
+
+    Returns
+    -------
+    StreamingResponse
+        Поток результатов сокращения для каждого элемента пакета.
+    """
+    body = await request.body()
+    content_type = request.headers.get('content-type', '')
+    user_id = user if user is None else user.id
+
+    try:
+        items = list(enumerate(parse_batch(body, content_type)))
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Invalid batch: {error}',
+        )
+
+    async def stream_results() -> AsyncIterator[bytes]:
+        async with async_session() as session:
+            for start in range(0, len(items), BATCH_CHUNK_SIZE):
+                chunk = items[start:start + BATCH_CHUNK_SIZE]
+                for result in await shorten_chunk(session, chunk, user_id):
+                    yield json.dumps(result).encode() + b'\n'
+
+    return StreamingResponse(stream_results(), media_type='application/x-ndjson')
+
+
 @router_management.get('/{alias}')
-@cache(expire=60, namespace='url')
 async def redirect(
     alias: str,
     session: AsyncSession = Depends(get_async_session),
@@ -132,7 +533,8 @@ async def redirect(
     RedirectResponse
         Перенаправление на оригинальный URL.
     """
-    url = await search_url(session=session, alias=alias)
+    with span('redirect.resolve'):
+        url = await resolve_url(session=session, alias=alias)
 
     if url is None:
         raise HTTPException(
@@ -140,29 +542,13 @@ async def redirect(
             detail='Alias is not found! Create it first.',
         )
 
-    url.clicks_count += 1
-    url.last_clicked_at = datetime\
-        .now(timezone.utc)\
-        .replace(tzinfo=None)
+    # Клик и продление срока жизни записываются в базу пакетно.
+    click_buffer.record(alias)
 
-    AsyncResult(id=url.celery_task_id).revoke(terminate=True)
+    return RedirectResponse(url, status_code=307)
 
-    expire_at = url.expire_at + timedelta(seconds=int(LIFETIME))
 
-    celery_task = delete_expired_links.apply_async(
-        args=[url.alias],
-        eta=url.expire_at
-    )
-    url.celery_task_id = celery_task.id
-    url.expire_at = expire_at
-
-    await session.commit()
-    await session.refresh(url)
-
-    return RedirectResponse(url.url, status_code=307)
-
-
-@router_management.put('/{alias}')
+@router_management.put('/{alias}', dependencies=[Depends(pin_primary)])
 async def update(
     alias: str,
     updated_url: UpdateURL,
@@ -204,24 +590,25 @@ async def update(
     if not updated_url.update_url.startswith('https'):
         updated_url.update_url = 'https://' + updated_url.update_url
 
+    original_url = url.url
     url.url = updated_url.update_url
-
-    AsyncResult(id=url.celery_task_id).revoke(terminate=True)
-
-    expire_at = url.expire_at + timedelta(seconds=int(LIFETIME))
-
-    celery_task = delete_expired_links.apply_async(
-        args=[url.alias],
-        eta=url.expire_at,
-        expires=3600
+    url.url_hash = url_fingerprint(url.url)
+    # Алиас указывает на другой URL и больше не участвует в дедупликации.
+    url.dedupe = False
+    # Изменение продлевает URL так же, как клик: на `LIFETIME` от текущего момента.
+    url.expire_at = max(
+        url.expire_at,
+        datetime.now(timezone.utc).replace(tzinfo=None) + LINK_LIFETIME
     )
-    url.celery_task_id = celery_task.id
-    url.expire_at = expire_at
 
     await session.commit()
     await session.refresh(url)
 
-    await delete_redis_keys(namespace='url')
+    await invalidate_url(
+        alias,
+        link_keys(alias, url.user_id, url.project_name, [original_url, url.url]),
+        link_versions(alias, url.user_id, url.project_name)
+    )
 
     return {
         'detail': 'URL is updated!',
@@ -229,7 +616,7 @@ async def update(
     }
 
 
-@router_management.delete('/delete/{alias}')
+@router_management.delete('/delete/{alias}', dependencies=[Depends(pin_primary)])
 async def delete(
     alias: str,
     user: Optional[User] = Depends(current_active_optional_user),
@@ -281,12 +668,14 @@ async def delete(
         )
     )
 
-    AsyncResult(id=url.celery_task_id).revoke(terminate=True)
-
     await session.delete(url)
     await session.commit()
 
-    await delete_redis_keys(namespace='url')
+    await invalidate_url(
+        alias,
+        link_keys(alias, url.user_id, url.project_name, [url.url]),
+        link_versions(alias, url.user_id, url.project_name)
+    )
 
     return Response(
         status_code=status.HTTP_204_NO_CONTENT
@@ -294,14 +683,18 @@ async def delete(
 
 
 @router_management.get('/tools/search')
-@cache(expire=60, namespace='url')
+@cached(expire=60, namespace='url', key_builder=search_key_builder)
 async def search(
     original_url: str,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Ищет короткие URL, связанные с оригинальным URL.
 
+    Поиск выполняется по индексу отпечатка нормализованного URL, поэтому
+    находятся и URL, отличающиеся регистром хоста, портом по умолчанию
+    или порядком параметров запроса.
+
     Parameters
     ----------
     original_url : str
@@ -317,7 +710,7 @@ async def search(
     if not original_url.startswith('https'):
         original_url = 'https://' + original_url
 
-    query = select(CurrentURLs).where(CurrentURLs.url == original_url)
+    query = select(CurrentURLs).where(CurrentURLs.url_hash == url_fingerprint(original_url))
     query_result = await session.execute(query)
     query_result = query_result\
         .scalars()\
@@ -1,6 +1,6 @@
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from url_shortener.config import LIFETIME
 
 
@@ -9,14 +9,57 @@ class CreateURL(BaseModel):
     lifetime: int = LIFETIME
     alias: Optional[str] = None
     project_name: Optional[str] = None
+    dedupe: bool = False
 
 
 class UpdateURL(BaseModel):
     update_url: str
 
 
+class ClickBucket(BaseModel):
+    bucket_start: datetime
+    clicks: int
+
+
 class URLStatistics(BaseModel):
     url: str
     created_at: datetime
     clicks_count: int
     last_clicked_at: Optional[datetime]
+    timeseries: Optional[list[ClickBucket]] = None
+
+
+class CurrentURLRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    url: str
+    alias: str
+    created_at: datetime
+    expire_at: datetime
+    clicks_count: int
+    last_clicked_at: Optional[datetime]
+    project_name: Optional[str]
+
+
+class DeletedURLRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    url: str
+    alias: str
+    created_at: datetime
+    expired_at: datetime
+    clicks_count: int
+    last_clicked_at: Optional[datetime]
+    project_name: Optional[str]
+
+
+class CurrentURLPage(BaseModel):
+    items: list[CurrentURLRead]
+    next_cursor: Optional[int]
+
+
+class DeletedURLPage(BaseModel):
+    items: list[DeletedURLRead]
+    next_cursor: Optional[int]
@@ -1,40 +1,66 @@
-import asyncio
-from datetime import datetime, timedelta
-from fastapi import APIRouter, HTTPException, status, Depends
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_cache.decorator import cache
-from celery.result import AsyncResult
-from url_shortener.celery_app import delete_expired_links
 from url_shortener.db import (
     User,
     CurrentURLs,
     DeletedURLs,
-    get_async_session
+    ClickRollups
+)
+from url_shortener.api import current_active_user, is_pinned, get_read_session
+from url_shortener.metrics import span
+from url_shortener.utils import (
+    search_url,
+    cached,
+    stats_key_builder,
+    project_key_builder,
+    expired_key_builder,
+    export_response
+)
+from url_shortener.config import PAGE_SIZE_LIMIT, ROLLUP_MAX_BUCKETS
+from .schemas import (
+    ClickBucket,
+    URLStatistics,
+    CurrentURLRead,
+    DeletedURLRead,
+    CurrentURLPage,
+    DeletedURLPage
 )
-from url_shortener.api import current_active_user
-from url_shortener.utils import search_url
-from url_shortener.config import LIFETIME
-from .schemas import URLStatistics
 
 
 router_statistics = APIRouter()
 
 
 @router_statistics.get('/{alias}/stats')
-@cache(expire=60, namespace='url')
+@cached(expire=60, namespace='url', key_builder=stats_key_builder)
 async def get_statistics(
     alias: str,
+    granularity: Optional[Literal['minute', 'hour', 'day']] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     user: User = Depends(current_active_user),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Получает статистику для указанного короткого URL.
 
+    Если указан интервал агрегации, к статистике добавляется временной ряд
+    кликов из предварительно агрегированной таблицы `click_rollups`.
+
     Parameters
     ----------
     alias : str
         Короткий URL (алиас), для которого требуется статистика.
+    granularity : Optional[Literal['minute', 'hour', 'day']], optional
+        Интервал агрегации временного ряда, по умолчанию None.
+    start : Optional[datetime], optional
+        Начало временного ряда (включительно), по умолчанию None. Время
+        без часового пояса считается временем UTC.
+    end : Optional[datetime], optional
+        Конец временного ряда (не включительно), по умолчанию None. Время
+        без часового пояса считается временем UTC.
     user : User
         Текущий активный пользователь.
     session : AsyncSession
@@ -45,10 +71,8 @@ async def get_statistics(
     URLStatistics
         Объект со статистикой URL, включая количество кликов и дату последнего клика.
     """
-    # Имитация бурной деятельности для проверки кэша.
-    await asyncio.sleep(10)
-
-    url = await search_url(session=session, alias=alias)
+    with span('stats.lookup'):
+        url = await search_url(session=session, alias=alias)
 
     if url is None:
         raise HTTPException(
@@ -61,43 +85,70 @@ async def get_statistics(
             detail='Sorry, it`s not your URL!',
         )
 
-    AsyncResult(id=url.celery_task_id).revoke(terminate=True)
-
-    expire_at = url.expire_at + timedelta(seconds=int(LIFETIME))
-
-    celery_task = delete_expired_links.apply_async(
-        args=[url.alias],
-        eta=url.expire_at,
-        expires=3600
-    )
-    url.celery_task_id = celery_task.id
-    url.expire_at = expire_at
+    timeseries = None
+    if granularity is not None:
+        query = select(ClickRollups.bucket_start, ClickRollups.clicks).where(
+            and_(
+                ClickRollups.url_id == url.id,
+                ClickRollups.granularity == granularity
+            )
+        )
+        # `bucket_start` хранится без часового пояса в UTC.
+        if start is not None:
+            if start.tzinfo is not None:
+                start = start\
+                    .astimezone(timezone.utc)\
+                    .replace(tzinfo=None)
+            query = query.where(ClickRollups.bucket_start >= start)
+        if end is not None:
+            if end.tzinfo is not None:
+                end = end\
+                    .astimezone(timezone.utc)\
+                    .replace(tzinfo=None)
+            query = query.where(ClickRollups.bucket_start < end)
 
-    await session.commit()
-    await session.refresh(url)
+        query = query\
+            .order_by(ClickRollups.bucket_start)\
+            .limit(ROLLUP_MAX_BUCKETS)
+        with span('stats.timeseries'):
+            query_result = await session.execute(query)
+        timeseries = [
+            ClickBucket(bucket_start=bucket_start, clicks=clicks)
+            for bucket_start, clicks in query_result.all()
+        ]
 
     return URLStatistics(
         url=url.url,
         created_at=url.created_at,
         clicks_count=url.clicks_count,
-        last_clicked_at=url.last_clicked_at
+        last_clicked_at=url.last_clicked_at,
+        timeseries=timeseries
     )
 
 
 @router_statistics.get('/projects/{project_name}')
-@cache(expire=60, namespace='url')
+@cached(expire=60, namespace='url', key_builder=project_key_builder)
 async def get_project_name(
     project_name: str,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=PAGE_SIZE_LIMIT),
     user: User = Depends(current_active_user),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
-    Получает все текущие URL, связанные с указанным проектом.
+    Получает страницу текущих URL, связанных с указанным проектом.
+
+    Страницы выбираются по ключу `id`: следующая страница запрашивается
+    с курсором `next_cursor` из предыдущего ответа.
 
     Parameters
     ----------
     project_name : str
         Название проекта для поиска URL.
+    cursor : Optional[int], optional
+        ID последнего URL предыдущей страницы, по умолчанию None.
+    limit : int
+        Максимальное количество URL на странице.
     user : User
         Текущий активный пользователь.
     session : AsyncSession
@@ -105,8 +156,8 @@ async def get_project_name(
 
     Returns
     -------
-    list
-        Список текущих URL, связанных с проектом.
+    CurrentURLPage
+        Страница текущих URL, связанных с проектом.
     """
     query = select(CurrentURLs).where(
         and_(
@@ -114,31 +165,88 @@ async def get_project_name(
             CurrentURLs.user_id == user.id
         )
     )
+    if cursor is not None:
+        query = query.where(CurrentURLs.id > cursor)
+
+    query = query\
+        .order_by(CurrentURLs.id)\
+        .limit(limit + 1)
     query_result = await session.execute(query)
     query_result = query_result\
         .scalars()\
         .all()
 
-    if not query_result:
+    if not query_result and cursor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'Project {project_name} is not found! Create it first.',
         )
 
-    return query_result
+    items = query_result[:limit]
+    return CurrentURLPage(
+        items=items,
+        next_cursor=items[-1].id if len(query_result) > limit else None
+    )
+
+
+@router_statistics.get('/projects/{project_name}/export')
+async def export_project_name(
+    project_name: str,
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    user: User = Depends(current_active_user),
+    pinned: bool = Depends(is_pinned),
+):
+    """
+    Выгружает все текущие URL проекта потоком в формате NDJSON или CSV.
+
+    Parameters
+    ----------
+    project_name : str
+        Название проекта для выгрузки URL.
+    export_format : Literal['ndjson', 'csv']
+        Формат выгрузки.
+    user : User
+        Текущий активный пользователь.
+    pinned : bool
+        Читать с основного сервера.
+
+    Returns
+    -------
+    StreamingResponse
+        Потоковая выгрузка URL проекта.
+    """
+    query = select(*(getattr(CurrentURLs, name) for name in CurrentURLRead.model_fields))\
+        .where(
+            and_(
+                CurrentURLs.project_name == project_name,
+                CurrentURLs.user_id == user.id
+            )
+        )\
+        .order_by(CurrentURLs.id)
+
+    return export_response(query, export_format, project_name, primary=pinned)
 
 
 @router_statistics.get('/tools/expired_urls')
-@cache(expire=60, namespace='url')
+@cached(expire=60, namespace='url', key_builder=expired_key_builder)
 async def get_expired_urls(
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=PAGE_SIZE_LIMIT),
     user: User = Depends(current_active_user),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
-    Получает список всех истекших URL для текущего пользователя.
+    Получает страницу истекших URL для текущего пользователя.
+
+    Страницы выбираются по ключу `id`: следующая страница запрашивается
+    с курсором `next_cursor` из предыдущего ответа.
 
     Parameters
     ----------
+    cursor : Optional[int], optional
+        ID последнего URL предыдущей страницы, по умолчанию None.
+    limit : int
+        Максимальное количество URL на странице.
     user : User
         Текущий активный пользователь.
     session : AsyncSession
@@ -146,15 +254,55 @@ async def get_expired_urls(
 
     Returns
     -------
-    list
-        Список истекших URL.
+    DeletedURLPage
+        Страница истекших URL.
     """
     query = select(DeletedURLs).where(
         and_(DeletedURLs.user_id == user.id)
     )
+    if cursor is not None:
+        query = query.where(DeletedURLs.id > cursor)
+
+    query = query\
+        .order_by(DeletedURLs.id)\
+        .limit(limit + 1)
     query_result = await session.execute(query)
     query_result = query_result\
         .scalars()\
         .all()
 
-    return query_result
+    items = query_result[:limit]
+    return DeletedURLPage(
+        items=items,
+        next_cursor=items[-1].id if len(query_result) > limit else None
+    )
+
+
+@router_statistics.get('/tools/expired_urls/export')
+async def export_expired_urls(
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    user: User = Depends(current_active_user),
+    pinned: bool = Depends(is_pinned),
+):
+    """
+    Выгружает все истекшие URL пользователя потоком в формате NDJSON или CSV.
+
+    Parameters
+    ----------
+    export_format : Literal['ndjson', 'csv']
+        Формат выгрузки.
+    user : User
+        Текущий активный пользователь.
+    pinned : bool
+        Читать с основного сервера.
+
+    Returns
+    -------
+    StreamingResponse
+        Потоковая выгрузка истекших URL.
+    """
+    query = select(*(getattr(DeletedURLs, name) for name in DeletedURLRead.model_fields))\
+        .where(DeletedURLs.user_id == user.id)\
+        .order_by(DeletedURLs.id)
+
+    return export_response(query, export_format, 'expired_urls', primary=pinned)
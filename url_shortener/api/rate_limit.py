@@ -0,0 +1,47 @@
+from fastapi import HTTPException, Request, status
+from url_shortener.utils import rate_limiter, retry_after_header, RateLimit
+from url_shortener.config import RATE_LIMITS
+from .auth import request_user_id
+
+
+class RateLimited:
+    """
+    Зависимость, ограничивающая частоту запросов к маршруту.
+
+    Проверяются ограничения маршрута из `RATE_LIMITS` по IP-адресу клиента,
+    по пользователю из токена и общее ограничение маршрута. Проверка
+    выполняется до разрешения пользователя и обращения к базе данных,
+    превышение ограничения завершает запрос ответом 429.
+
+    Parameters
+    ----------
+    route : str
+        Название маршрута в `RATE_LIMITS`.
+    """
+
+    def __init__(self, route: str):
+        self.route = route
+        self.limits = {
+            scope: RateLimit.parse(value)
+            for scope, value in RATE_LIMITS[route].items()
+        }
+
+    async def __call__(self, request: Request) -> None:
+        identities = {
+            'ip': request.client.host if request.client is not None else None,
+            'user': request_user_id(request),
+            'route': self.route
+        }
+
+        for scope, limit in self.limits.items():
+            identity = identities[scope]
+            if limit is None or identity is None:
+                continue
+
+            retry_after = await rate_limiter.hit(f'{self.route}:{scope}:{identity}', limit)
+            if retry_after is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail='Too many requests! Try again later.',
+                    headers={'Retry-After': retry_after_header(retry_after)}
+                )
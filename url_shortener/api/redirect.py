@@ -0,0 +1,103 @@
+import json
+from functools import lru_cache
+from urllib.parse import quote
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+from url_shortener.utils import click_buffer, resolve_url
+from url_shortener.metrics import span
+
+
+# Совпадает с экранированием `RedirectResponse` из Starlette.
+LOCATION_SAFE_CHARS = ":/%#?=@[]!$&'()*+,;"
+
+NOT_FOUND_BODY = json.dumps(
+    {'detail': 'Alias is not found! Create it first.'},
+    separators=(',', ':')
+).encode()
+NOT_FOUND_HEADERS = (
+    (b'content-type', b'application/json'),
+    (b'content-length', str(len(NOT_FOUND_BODY)).encode())
+)
+
+
+@lru_cache(maxsize=65536)
+def redirect_headers(url: str) -> tuple[tuple[bytes, bytes], ...]:
+    """
+    Возвращает заголовки перенаправления на URL.
+
+    Parameters
+    ----------
+    url : str
+        Оригинальный URL.
+
+    Returns
+    -------
+    tuple[tuple[bytes, bytes], ...]
+        Заголовки ответа 307.
+    """
+    return (
+        (b'location', quote(url, safe=LOCATION_SAFE_CHARS).encode('latin-1')),
+        (b'content-length', b'0')
+    )
+
+
+class RedirectMiddleware:
+    """
+    ASGI-middleware, обслуживающая перенаправления по алиасу в обход FastAPI.
+
+    Запросы `GET` к маршруту перенаправления обрабатываются без разрешения
+    зависимостей и валидации: алиас ищется в кэше, сессия базы данных
+    открывается только при промахе. Остальные запросы передаются приложению.
+    Сам маршрут остается в приложении для документации API.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        Оборачиваемое ASGI-приложение.
+    route : APIRoute
+        Маршрут перенаправления вида `/<префикс>/{alias}`.
+    """
+
+    def __init__(self, app: ASGIApp, route: APIRoute):
+        self.app = app
+        self.route = route
+        self.prefix = route.path.rsplit('/', 1)[0] + '/'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        path = scope['path']
+        if not path.startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        alias = path[len(self.prefix):]
+        if not alias or '/' in alias:
+            await self.app(scope, receive, send)
+            return
+
+        scope['route'] = self.route
+
+        with span('redirect.resolve'):
+            url = await resolve_url(session=None, alias=alias)
+
+        if url is None:
+            await send({
+                'type': 'http.response.start',
+                'status': 404,
+                'headers': NOT_FOUND_HEADERS
+            })
+            await send({'type': 'http.response.body', 'body': NOT_FOUND_BODY})
+            return
+
+        # Клик и продление срока жизни записываются в базу пакетно.
+        click_buffer.record(alias)
+
+        await send({
+            'type': 'http.response.start',
+            'status': 307,
+            'headers': redirect_headers(url)
+        })
+        await send({'type': 'http.response.body', 'body': b''})
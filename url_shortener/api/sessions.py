@@ -0,0 +1,90 @@
+import logging
+from typing import AsyncGenerator
+from fastapi import Depends, Request
+from fastapi_cache import FastAPICache
+from sqlalchemy.ext.asyncio import AsyncSession
+from url_shortener.db import read_session, replica_router
+from url_shortener.config import CACHE_PREFIX, DB_READ_YOUR_WRITES_TTL
+from .auth import request_user_id
+
+
+logger = logging.getLogger(__name__)
+
+
+def _pin_key(user_id: str) -> str:
+    return f'{CACHE_PREFIX}:primary-pin:{user_id}'
+
+
+async def pin_primary(request: Request) -> None:
+    """
+    Закрепляет чтения пользователя за основным сервером после записи.
+
+    Используется как зависимость изменяющих маршрутов: в течение
+    `DB_READ_YOUR_WRITES_TTL` секунд пользователь читает с основного сервера
+    и видит свои изменения, даже если реплики отстают.
+
+    Parameters
+    ----------
+    request : Request
+        Объект HTTP-запроса.
+    """
+    user_id = request_user_id(request)
+    if not replica_router.replicas or user_id is None:
+        return
+
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    try:
+        await redis.set(_pin_key(user_id), 1, ex=DB_READ_YOUR_WRITES_TTL)
+    except Exception:
+        logger.warning('Failed to pin user to primary.', exc_info=True)
+
+
+async def is_pinned(request: Request) -> bool:
+    """
+    Проверяет, должен ли пользователь читать с основного сервера.
+
+    Parameters
+    ----------
+    request : Request
+        Объект HTTP-запроса.
+
+    Returns
+    -------
+    bool
+        True, если пользователь недавно изменял данные или закрепление
+        не удалось проверить.
+    """
+    user_id = request_user_id(request)
+    if not replica_router.replicas or user_id is None:
+        return False
+
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    try:
+        return bool(await redis.exists(_pin_key(user_id)))
+    except Exception:
+        logger.warning('Failed to check primary pin.', exc_info=True)
+        return True
+
+
+async def get_read_session(
+        pinned: bool = Depends(is_pinned)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Предоставляет сессию для маршрутов только на чтение.
+
+    Parameters
+    ----------
+    pinned : bool
+        Читать с основного сервера.
+
+    Returns
+    -------
+    AsyncGenerator[AsyncSession, None]
+        Генератор асинхронной сессии реплики или основного сервера.
+    """
+    async with read_session(primary=pinned) as session:
+        yield session
@@ -1,10 +1,11 @@
+import asyncio
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from fastapi import Depends, FastAPI
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
-from url_shortener.db import User
+from url_shortener.db import User, replica_router
 from url_shortener.api import (
     UserCreate,
     UserRead,
@@ -12,12 +13,28 @@ from url_shortener.api import (
     auth_backend,
     current_active_user,
     fastapi_users,
+    listen_user_invalidations,
     router_management,
-    router_statistics
+    router_statistics,
+    RedirectMiddleware
 )
+from url_shortener.utils import (
+    CompactCoder,
+    alias_filter,
+    click_buffer,
+    invalidation_publisher,
+    listen_url_invalidations
+)
+from url_shortener.metrics import MetricsMiddleware, router_metrics, run_pool_sampler
 from url_shortener.config import (
     REDIS_HOST_CACHE,
-    REDIS_PORT_CACHE
+    REDIS_PORT_CACHE,
+    CLICKS_FLUSH_INTERVAL,
+    URL_INVALIDATION_FLUSH_INTERVAL,
+    ALIAS_FILTER_REBUILD_INTERVAL,
+    METRICS_SAMPLE_INTERVAL,
+    DB_REPLICA_CHECK_INTERVAL,
+    CACHE_PREFIX
 )
 
 
@@ -26,17 +43,54 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     """
     Контекстный менеджер для управления временем жизни приложения.
 
-    Выполняет создание базы данных и инициализацию кэша Redis.
+    Выполняет создание базы данных, инициализацию кэша Redis, запуск
+    фоновой записи кликов в базу данных, подписку на инвалидацию кэшей URL
+    и пользователей, построение фильтра алиасов, проверку отставания реплик
+    и сбор показателей пула соединений.
 
     Yields
     ------
     None
     """
     redis = aioredis.from_url(f'redis://{REDIS_HOST_CACHE}:{REDIS_PORT_CACHE}')
-    FastAPICache.init(RedisBackend(redis), prefix='fastapi-cache')
+    FastAPICache.init(RedisBackend(redis), prefix=CACHE_PREFIX, coder=CompactCoder)
+
+    clicks_flusher = asyncio.create_task(click_buffer.run(CLICKS_FLUSH_INTERVAL))
+    invalidation_listener = asyncio.create_task(listen_url_invalidations(redis))
+    invalidation_flusher = asyncio.create_task(
+        invalidation_publisher.run(URL_INVALIDATION_FLUSH_INTERVAL)
+    )
+    user_invalidation_listener = asyncio.create_task(listen_user_invalidations(redis))
+    alias_filter_listener = asyncio.create_task(alias_filter.listen(redis))
+    alias_filter_rebuilder = asyncio.create_task(
+        alias_filter.run(ALIAS_FILTER_REBUILD_INTERVAL)
+    )
+    alias_filter_publisher = asyncio.create_task(
+        alias_filter.run_publisher(URL_INVALIDATION_FLUSH_INTERVAL)
+    )
+    replica_checker = asyncio.create_task(replica_router.run(DB_REPLICA_CHECK_INTERVAL))
+    pool_sampler = asyncio.create_task(run_pool_sampler(METRICS_SAMPLE_INTERVAL))
 
     yield
 
+    for task in (
+        clicks_flusher,
+        invalidation_listener,
+        invalidation_flusher,
+        user_invalidation_listener,
+        alias_filter_listener,
+        alias_filter_rebuilder,
+        alias_filter_publisher,
+        replica_checker,
+        pool_sampler
+    ):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await click_buffer.flush()
+    await invalidation_publisher.flush()
+    await alias_filter.flush()
+
 
 app = FastAPI(lifespan=lifespan)
 
@@ -77,6 +131,16 @@ app.include_router(
 )
 
 
+app.include_router(router=router_metrics)
+
+# Перенаправления обслуживаются до маршрутизации FastAPI, метрики их тоже учитывают.
+app.add_middleware(
+    RedirectMiddleware,
+    route=next(route for route in app.routes if route.name == 'redirect')
+)
+app.add_middleware(MetricsMiddleware)
+
+
 @app.get('/authenticated-route')
 async def authenticated_route(user: User = Depends(current_active_user)) -> dict:
     """
@@ -1,4 +1,16 @@
-from .celery_app import delete_expired_links
+from .celery_app import (
+    celery,
+    sweep_expired_links,
+    prune_click_rollups,
+    backfill_url_fingerprints,
+    archive_deleted_urls
+)
 
 
-__all__ = ['delete_expired_links']
+__all__ = [
+    'celery',
+    'sweep_expired_links',
+    'prune_click_rollups',
+    'backfill_url_fingerprints',
+    'archive_deleted_urls'
+]
@@ -1,15 +1,50 @@
-from typing import Union
-from datetime import datetime, timezone
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any
 from celery import Celery
-from sqlalchemy import select, insert
+from redis import Redis
+from sqlalchemy import (
+    select,
+    insert,
+    update,
+    delete,
+    literal,
+    table,
+    column,
+    Connection,
+    Row
+)
 from url_shortener.db import (
+    sync_engine,
     sync_session,
     CurrentURLs,
-    DeletedURLs
+    DeletedURLs,
+    ClickRollups
+)
+from url_shortener.utils.cache_keys import link_keys, link_versions, VERSION_TTL
+from url_shortener.db.partitions import (
+    DELETED_URLS_TABLE,
+    ensure_partitions,
+    list_partitions,
+    drop_partition
 )
+from url_shortener.utils.urls import url_fingerprint
 from url_shortener.config import (
+    REDIS_HOST_CACHE,
+    REDIS_PORT_CACHE,
     REDIS_HOST_CELERY,
-    REDIS_PORT_CELERY
+    REDIS_PORT_CELERY,
+    URL_INVALIDATION_CHANNEL,
+    EXPIRY_SWEEP_INTERVAL,
+    EXPIRY_SWEEP_BATCH_SIZE,
+    BACKFILL_BATCH_SIZE,
+    DELETED_URLS_RETENTION_DAYS,
+    DELETED_URLS_PARTITIONS_AHEAD,
+    ARCHIVE_DIR,
+    EXPORT_BATCH_SIZE,
+    ROLLUP_RETENTION_DAYS
 )
 
 
@@ -19,47 +54,303 @@ celery = Celery(
     backend=f'redis://{REDIS_HOST_CELERY}:{REDIS_PORT_CELERY}/0'
 )
 celery.conf.timezone = 'UTC'
+celery.conf.beat_schedule = {
+    'sweep_expired_links': {
+        'task': 'sweep_expired_links',
+        'schedule': EXPIRY_SWEEP_INTERVAL,
+        'options': {'expires': EXPIRY_SWEEP_INTERVAL}
+    },
+    'prune_click_rollups': {
+        'task': 'prune_click_rollups',
+        'schedule': 60 * 60
+    },
+    'archive_deleted_urls': {
+        'task': 'archive_deleted_urls',
+        'schedule': 24 * 60 * 60
+    }
+}
+
+cache_redis = Redis(host=REDIS_HOST_CACHE, port=REDIS_PORT_CACHE)
 
 
-@celery.task(name='delete_expired_links')
-def delete_expired_links(alias: str) -> Union[str, None]:
+def move_expired_links(now: datetime, batch_size: int) -> list[Row]:
     """
-    Удаляет истекший короткий URL и перемещает его в таблицу удаленных URL.
+    Перемещает одну пачку истекших URL в таблицу удаленных URL.
+
+    Кандидаты выбираются по индексу на `expire_at` и отбрасываются, если
+    фактический срок с учетом последнего клика еще не наступил. Истекшие
+    строки удаляются через `DELETE ... RETURNING` и вставляются
+    в `deleted_urls` тем же запросом.
+    Строки, заблокированные другими транзакциями, пропускаются.
 
     Parameters
     ----------
-    alias : str
-        Короткий URL (алиас), который нужно удалить.
+    now : datetime
+        Текущее время в UTC.
+    batch_size : int
+        Максимальное количество URL в пачке.
 
     Returns
     -------
-    Union[str, None]
-        Сообщение об ошибке, если URL уже удален, или None в случае успешного выполнения.
+    list[Row]
+        Алиас, владелец, проект и оригинальный URL перемещенных URL.
     """
-    with sync_session() as session:
-        query = select(CurrentURLs).where(CurrentURLs.alias == alias)
-        query_result = session.execute(query)
-        query_result = query_result.scalar_one_or_none()
-
-        if query_result is None:
-            return {
-                'detail': 'URL is already deleted!'
-            }
-
-        session.execute(
-            insert(DeletedURLs).values(
-                user_id=query_result.user_id,
-                url=query_result.url,
-                alias=query_result.alias,
-                created_at=query_result.created_at,
-                expired_at=datetime
-                .now(timezone.utc)
-                .replace(tzinfo=None),
-                clicks_count=query_result.clicks_count,
-                last_clicked_at=query_result.last_clicked_at,
-                project_name=query_result.project_name
+    due = select(CurrentURLs.id)\
+        .where(
+            CurrentURLs.expire_at <= now,
+            CurrentURLs.effective_expire_at <= now
+        )\
+        .order_by(CurrentURLs.expire_at)\
+        .limit(batch_size)\
+        .with_for_update(skip_locked=True)
+
+    expired = delete(CurrentURLs)\
+        .where(CurrentURLs.id.in_(due.scalar_subquery()))\
+        .returning(
+            CurrentURLs.user_id,
+            CurrentURLs.url,
+            CurrentURLs.alias,
+            CurrentURLs.created_at,
+            CurrentURLs.clicks_count,
+            CurrentURLs.last_clicked_at,
+            CurrentURLs.project_name
+        )\
+        .cte('expired')
+
+    query = insert(DeletedURLs)\
+        .add_cte(expired)\
+        .from_select(
+            [
+                'user_id',
+                'url',
+                'alias',
+                'created_at',
+                'expired_at',
+                'clicks_count',
+                'last_clicked_at',
+                'project_name'
+            ],
+            select(
+                expired.c.user_id,
+                expired.c.url,
+                expired.c.alias,
+                expired.c.created_at,
+                literal(now, DeletedURLs.expired_at.type),
+                expired.c.clicks_count,
+                expired.c.last_clicked_at,
+                expired.c.project_name
             )
+        )\
+        .returning(
+            DeletedURLs.alias,
+            DeletedURLs.user_id,
+            DeletedURLs.project_name,
+            DeletedURLs.url
         )
 
-        session.delete(query_result)
+    with sync_session() as session:
+        moved = session.execute(query).all()
+        session.commit()
+
+    return moved
+
+
+@celery.task(name='sweep_expired_links')
+def sweep_expired_links() -> dict:
+    """
+    Перемещает все истекшие короткие URL в таблицу удаленных URL пачками.
+
+    Returns
+    -------
+    dict
+        Количество перемещенных URL.
+    """
+    now = datetime\
+        .now(timezone.utc)\
+        .replace(tzinfo=None)
+    moved = 0
+
+    while True:
+        links = move_expired_links(now, EXPIRY_SWEEP_BATCH_SIZE)
+        moved += len(links)
+
+        if links:
+            pipe = cache_redis.pipeline(transaction=False)
+            pipe.unlink(*{
+                key
+                for alias, user_id, project_name, url in links
+                for key in link_keys(alias, user_id, project_name, [url])
+            })
+            for version in {
+                version
+                for alias, user_id, project_name, _ in links
+                for version in link_versions(alias, user_id, project_name)
+            }:
+                pipe\
+                    .incr(version)\
+                    .expire(version, VERSION_TTL)
+            pipe.publish(URL_INVALIDATION_CHANNEL, json.dumps([alias for alias, *_ in links]))
+            pipe.execute()
+
+        if len(links) < EXPIRY_SWEEP_BATCH_SIZE:
+            break
+
+    return {
+        'moved': moved
+    }
+
+
+@celery.task(name='prune_click_rollups')
+def prune_click_rollups() -> dict:
+    """
+    Удаляет устаревшие поминутные и почасовые агрегаты кликов.
+
+    Returns
+    -------
+    dict
+        Количество удаленных агрегатов.
+    """
+    now = datetime\
+        .now(timezone.utc)\
+        .replace(tzinfo=None)
+    pruned = 0
+
+    with sync_session() as session:
+        for granularity, retention_days in ROLLUP_RETENTION_DAYS.items():
+            query_result = session.execute(
+                delete(ClickRollups).where(
+                    ClickRollups.granularity == granularity,
+                    ClickRollups.bucket_start < now - timedelta(days=retention_days)
+                )
+            )
+            pruned += query_result.rowcount
         session.commit()
+
+    return {
+        'pruned': pruned
+    }
+
+
+@celery.task(name='backfill_url_fingerprints')
+def backfill_url_fingerprints() -> dict:
+    """
+    Заполняет отпечатки нормализованных URL для строк, созданных до их появления.
+
+    Returns
+    -------
+    dict
+        Количество обновленных URL.
+    """
+    updated = 0
+
+    while True:
+        with sync_session() as session:
+            links = session.execute(
+                select(CurrentURLs.id, CurrentURLs.url)
+                .where(CurrentURLs.url_hash.is_(None))
+                .limit(BACKFILL_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            ).all()
+
+            if links:
+                session.execute(
+                    update(CurrentURLs),
+                    [
+                        {'id': link_id, 'url_hash': url_fingerprint(url)}
+                        for link_id, url in links
+                    ]
+                )
+                session.commit()
+
+        updated += len(links)
+
+        if len(links) < BACKFILL_BATCH_SIZE:
+            break
+
+    return {
+        'updated': updated
+    }
+
+
+def _archive_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def archive_partition(connection: Connection, name: str, directory: str) -> int:
+    """
+    Выгружает секцию таблицы удаленных URL в файл NDJSON, сжатый gzip.
+
+    Строки читаются серверным курсором, файл сначала пишется под временным
+    именем и переименовывается после завершения записи, поэтому повторный
+    запуск после сбоя просто перезаписывает архив.
+
+    Parameters
+    ----------
+    connection : Connection
+        Соединение с базой данных.
+    name : str
+        Имя секции.
+    directory : str
+        Каталог архивов.
+
+    Returns
+    -------
+    int
+        Количество выгруженных строк.
+    """
+    partition = table(name, *(column(key) for key in DeletedURLs.__table__.columns.keys()))
+    query_result = connection\
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)\
+        .execute(select(partition))
+
+    path = os.path.join(directory, f'{name}.ndjson.gz')
+    rows = 0
+    with gzip.open(f'{path}.tmp', 'wt', encoding='utf-8') as archive:
+        for row in query_result:
+            archive.write(json.dumps(row._asdict(), default=_archive_default) + '\n')
+            rows += 1
+    os.replace(f'{path}.tmp', path)
+
+    return rows
+
+
+@celery.task(name='archive_deleted_urls')
+def archive_deleted_urls() -> dict:
+    """
+    Обслуживает секции таблицы удаленных URL.
+
+    Заранее создает секции следующих месяцев, а секции, все строки которых
+    старше `DELETED_URLS_RETENTION_DAYS` дней, выгружает в `ARCHIVE_DIR`
+    и удаляет.
+
+    Returns
+    -------
+    dict
+        Созданные секции и количество строк в архивированных секциях.
+    """
+    now = datetime\
+        .now(timezone.utc)\
+        .replace(tzinfo=None)
+    cutoff = now - timedelta(days=DELETED_URLS_RETENTION_DAYS)
+    directory = os.path.join(ARCHIVE_DIR, DELETED_URLS_TABLE)
+    os.makedirs(directory, exist_ok=True)
+
+    with sync_engine.begin() as connection:
+        created = ensure_partitions(connection, now, DELETED_URLS_PARTITIONS_AHEAD)
+        partitions = list_partitions(connection)
+
+    archived = {}
+    for name, upper_bound in partitions:
+        if upper_bound is None or upper_bound > cutoff:
+            continue
+
+        with sync_engine.begin() as connection:
+            archived[name] = archive_partition(connection, name, directory)
+            drop_partition(connection, name)
+
+    return {
+        'created': created,
+        'archived': archived
+    }
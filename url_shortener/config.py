@@ -6,7 +6,47 @@ load_dotenv()
 
 
 AUTH_TOKEN = os.getenv('AUTH_TOKEN')
-LIFETIME = os.getenv('LIFETIME')
+LIFETIME = int(os.getenv('LIFETIME', 180))
+CLICKS_FLUSH_INTERVAL = float(os.getenv('CLICKS_FLUSH_INTERVAL', 5))
+CLICKS_BUFFER_MAX_ALIASES = int(os.getenv('CLICKS_BUFFER_MAX_ALIASES', 100_000))
+CLICKS_BUFFER_MAX_BUCKETS = int(os.getenv('CLICKS_BUFFER_MAX_BUCKETS', 1_000_000))
+EXPIRY_SWEEP_INTERVAL = float(os.getenv('EXPIRY_SWEEP_INTERVAL', 30))
+EXPIRY_SWEEP_BATCH_SIZE = int(os.getenv('EXPIRY_SWEEP_BATCH_SIZE', 1000))
+EXPIRY_EXTEND_THRESHOLD = float(os.getenv('EXPIRY_EXTEND_THRESHOLD', 0.01))
+BACKFILL_BATCH_SIZE = int(os.getenv('BACKFILL_BATCH_SIZE', 5000))
+DELETED_URLS_RETENTION_DAYS = int(os.getenv('DELETED_URLS_RETENTION_DAYS', 90))
+DELETED_URLS_PARTITIONS_AHEAD = int(os.getenv('DELETED_URLS_PARTITIONS_AHEAD', 2))
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+
+ROLLUP_MAX_BUCKETS = int(os.getenv('ROLLUP_MAX_BUCKETS', 1000))
+ROLLUP_RETENTION_DAYS = {
+    'minute': int(os.getenv('ROLLUP_MINUTE_RETENTION_DAYS', 2)),
+    'hour': int(os.getenv('ROLLUP_HOUR_RETENTION_DAYS', 90))
+}
+
+ALIAS_STRATEGY = os.getenv('ALIAS_STRATEGY', 'sequence')
+ALIAS_SEQUENCE_BACKEND = os.getenv('ALIAS_SEQUENCE_BACKEND', 'postgres')
+ALIAS_BLOCK_SIZE = int(os.getenv('ALIAS_BLOCK_SIZE', 1000))
+ALIAS_MIN_LENGTH = int(os.getenv('ALIAS_MIN_LENGTH', 6))
+ALIAS_WORKER_ID = int(os.getenv('ALIAS_WORKER_ID')) if os.getenv('ALIAS_WORKER_ID') else None
+ALIAS_ALLOCATION_ATTEMPTS = int(os.getenv('ALIAS_ALLOCATION_ATTEMPTS', 5))
+
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', 1000))
+PAGE_SIZE_LIMIT = int(os.getenv('PAGE_SIZE_LIMIT', 1000))
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+WEB_BIND = os.getenv('WEB_BIND', '0.0.0.0:8000')
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', 0))
+WEB_PRELOAD = os.getenv('WEB_PRELOAD', 'true').lower() == 'true'
+WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', 5))
+WEB_BACKLOG = int(os.getenv('WEB_BACKLOG', 2048))
+WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 60))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 0))
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', 0))
+
+METRICS_SAMPLE_INTERVAL = float(os.getenv('METRICS_SAMPLE_INTERVAL', 5))
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '/tmp/url-shortener-metrics')
 
 DB_USER = os.getenv('DB_USER')
 DATABASE_PASS = os.getenv('DB_PASSWORD')
@@ -18,7 +58,66 @@ DATABASE_CREDENTIALS = f'{DB_USER}:{DATABASE_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}
 ASYNC_DATABASE_URL = 'postgresql+asyncpg://' + DATABASE_CREDENTIALS
 SYNC_DATABASE_URL = 'postgresql+psycopg2://' + DATABASE_CREDENTIALS
 
+# Реплики для чтения через запятую в формате host:port, пустое значение — без реплик.
+DB_REPLICA_HOSTS = [host for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host]
+REPLICA_DATABASE_URLS = [
+    f'postgresql+asyncpg://{DB_USER}:{DATABASE_PASS}@{host}/{DB_NAME}'
+    for host in DB_REPLICA_HOSTS
+]
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 5))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 2))
+DB_READ_YOUR_WRITES_TTL = int(os.getenv('DB_READ_YOUR_WRITES_TTL', 10))
+# Размер таблицы в строках, начиная с которого последовательное сканирование
+# в плане запроса считается регрессией (`python -m url_shortener.db.advisor`).
+INDEX_ADVISOR_MIN_ROWS = int(os.getenv('INDEX_ADVISOR_MIN_ROWS', 10_000))
+
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 100))
+DB_PGBOUNCER_MODE = os.getenv('DB_PGBOUNCER_MODE', 'false').lower() == 'true'
+
 REDIS_HOST_CACHE = os.getenv('REDIS_HOST_CACHE')
 REDIS_PORT_CACHE = os.getenv('REDIS_PORT_CACHE')
 REDIS_HOST_CELERY = os.getenv('REDIS_HOST_CELERY')
 REDIS_PORT_CELERY = os.getenv('REDIS_PORT_CELERY')
+
+CACHE_PREFIX = 'fastapi-cache'
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 30))
+
+URL_CACHE_MAX_ENTRIES = int(os.getenv('URL_CACHE_MAX_ENTRIES', 100_000))
+URL_CACHE_MAX_BYTES = int(os.getenv('URL_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+URL_CACHE_TTL = float(os.getenv('URL_CACHE_TTL', 30))
+URL_CACHE_NEGATIVE_TTL = float(os.getenv('URL_CACHE_NEGATIVE_TTL', 5))
+URL_INVALIDATION_CHANNEL = 'url-invalidation'
+URL_INVALIDATION_FLUSH_INTERVAL = float(os.getenv('URL_INVALIDATION_FLUSH_INTERVAL', 0.05))
+URL_INVALIDATION_BATCH_SIZE = int(os.getenv('URL_INVALIDATION_BATCH_SIZE', 1000))
+
+ALIAS_FILTER_CAPACITY = int(os.getenv('ALIAS_FILTER_CAPACITY', 1_000_000))
+ALIAS_FILTER_ERROR_RATE = float(os.getenv('ALIAS_FILTER_ERROR_RATE', 0.01))
+ALIAS_FILTER_REBUILD_INTERVAL = float(os.getenv('ALIAS_FILTER_REBUILD_INTERVAL', 3600))
+ALIAS_FILTER_CHANNEL = 'alias-filter'
+ALIAS_FILTER_GENERATION_KEY = f'{CACHE_PREFIX}:alias-filter:generation'
+
+USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 10_000))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 30))
+USER_INVALIDATION_CHANNEL = 'user-invalidation'
+
+RATE_LIMIT_LEASE_SIZE = int(os.getenv('RATE_LIMIT_LEASE_SIZE', 10))
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100_000))
+# Ограничения вида '<запросов>/<секунд>' по IP, пользователю и маршруту в целом,
+# пустая строка отключает ограничение.
+RATE_LIMITS = {
+    'shorten': {
+        'ip': os.getenv('RATE_LIMIT_SHORTEN_IP', '60/60'),
+        'user': os.getenv('RATE_LIMIT_SHORTEN_USER', '600/60'),
+        'route': os.getenv('RATE_LIMIT_SHORTEN_ROUTE', '')
+    },
+    'shorten_batch': {
+        'ip': os.getenv('RATE_LIMIT_SHORTEN_BATCH_IP', '10/60'),
+        'user': os.getenv('RATE_LIMIT_SHORTEN_BATCH_USER', '60/60'),
+        'route': os.getenv('RATE_LIMIT_SHORTEN_BATCH_ROUTE', '')
+    }
+}
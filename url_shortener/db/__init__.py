@@ -1,28 +1,42 @@
 from .db import (
     async_engine,
+    async_session,
     sync_engine,
     sync_session,
+    replica_engines,
+    replica_router,
+    read_session,
     get_user_db,
     get_async_session,
     create_db_and_tables
 )
+from .pool import get_pool_stats
 from .models import (
     Base,
+    alias_block_seq,
     User,
     CurrentURLs,
-    DeletedURLs
+    DeletedURLs,
+    ClickRollups
 )
 
 
 __all__ = [
     'async_engine',
+    'async_session',
     'sync_engine',
     'sync_session',
+    'replica_engines',
+    'replica_router',
+    'read_session',
     'get_user_db',
     'get_async_session',
     'create_db_and_tables',
+    'get_pool_stats',
     'Base',
+    'alias_block_seq',
     'User',
     'CurrentURLs',
-    'DeletedURLs'
+    'DeletedURLs',
+    'ClickRollups'
 ]
@@ -0,0 +1,234 @@
+import argparse
+import json
+import sys
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from sqlalchemy import (
+    Connection,
+    Executable,
+    String,
+    select,
+    text,
+    true,
+    any_,
+    bindparam
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from url_shortener.config import INDEX_ADVISOR_MIN_ROWS
+from .db import sync_engine
+from .models import CurrentURLs, DeletedURLs, ClickRollups
+
+
+def _queries() -> dict[str, Executable]:
+    """
+    Возвращает запросы приложения с типичными значениями параметров.
+
+    Запросы повторяют форму запросов обработчиков и фоновых задач: новый
+    запрос к базе данных добавляется сюда вместе с обработчиком. Запросы
+    с общими построителями, как сброс кликов, берутся из самих построителей.
+
+    Returns
+    -------
+    dict[str, Executable]
+        Запросы по названию.
+    """
+    # Импортируются здесь: модули приложения сами импортируют пакет db.
+    from url_shortener.api.endpoints.schemas import CurrentURLRead, DeletedURLRead
+    from url_shortener.utils.clicks import ClickBuffer
+
+    user_id = str(uuid.uuid4())
+    url_hash = '0' * 64
+    now = datetime\
+        .now(timezone.utc)\
+        .replace(tzinfo=None)
+
+    project_page = select(CurrentURLs)\
+        .where(
+            CurrentURLs.project_name == 'project',
+            CurrentURLs.user_id == user_id,
+            CurrentURLs.id > 0
+        )\
+        .order_by(CurrentURLs.id)\
+        .limit(101)
+    expired_page = select(DeletedURLs)\
+        .where(DeletedURLs.user_id == user_id, DeletedURLs.id > 0)\
+        .order_by(DeletedURLs.id)\
+        .limit(101)
+    dedupe = select(CurrentURLs.url_hash, CurrentURLs.project_name, CurrentURLs.alias)\
+        .where(
+            CurrentURLs.dedupe == true(),
+            CurrentURLs.url_hash == any_(
+                bindparam('url_hashes', [url_hash], type_=ARRAY(String))
+            ),
+            CurrentURLs.user_id.is_not_distinct_from(user_id)
+        )
+    batch_aliases = select(CurrentURLs.alias)\
+        .where(
+            CurrentURLs.alias == any_(
+                bindparam('aliases', ['example'], type_=ARRAY(String))
+            )
+        )
+    project_export = select(*(getattr(CurrentURLs, name) for name in CurrentURLRead.model_fields))\
+        .where(CurrentURLs.project_name == 'project', CurrentURLs.user_id == user_id)\
+        .order_by(CurrentURLs.id)
+    expired_export = select(*(getattr(DeletedURLs, name) for name in DeletedURLRead.model_fields))\
+        .where(DeletedURLs.user_id == user_id)\
+        .order_by(DeletedURLs.id)
+    stats_timeseries = select(ClickRollups.bucket_start, ClickRollups.clicks)\
+        .where(ClickRollups.url_id == 1, ClickRollups.granularity == 'hour')\
+        .order_by(ClickRollups.bucket_start)\
+        .limit(1000)
+    sweep_expired = select(CurrentURLs.id)\
+        .where(
+            CurrentURLs.expire_at <= now,
+            CurrentURLs.effective_expire_at <= now
+        )\
+        .order_by(CurrentURLs.expire_at)\
+        .limit(1000)
+    backfill_fingerprints = select(CurrentURLs.id, CurrentURLs.url)\
+        .where(CurrentURLs.url_hash.is_(None))\
+        .limit(5000)\
+        .with_for_update(skip_locked=True)
+
+    return {
+        'redirect': select(CurrentURLs).where(CurrentURLs.alias == 'example'),
+        'project_page': project_page,
+        'expired_page': expired_page,
+        'search': select(CurrentURLs).where(CurrentURLs.url_hash == url_hash),
+        'dedupe': dedupe,
+        'batch_aliases': batch_aliases,
+        'project_export': project_export,
+        'expired_export': expired_export,
+        'stats_timeseries': stats_timeseries,
+        'click_flush': ClickBuffer._update_query([('example', 1, now)]),
+        'sweep_expired': sweep_expired,
+        'backfill_fingerprints': backfill_fingerprints
+    }
+
+
+def explain(connection: Connection, query: Executable) -> dict:
+    """
+    Возвращает план выполнения запроса без его выполнения.
+
+    Без `ANALYZE` запрос не выполняется, поэтому так же проверяются и
+    запросы изменения данных.
+
+    Parameters
+    ----------
+    connection : Connection
+        Синхронное соединение с базой данных.
+    query : Executable
+        Запрос.
+
+    Returns
+    -------
+    dict
+        Корневой узел плана в формате `EXPLAIN (FORMAT JSON)`.
+    """
+    compiled = query.compile(
+        dialect=connection.dialect,
+        compile_kwargs={'render_postcompile': True}
+    )
+    plan = connection\
+        .exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params)\
+        .scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return plan[0]['Plan']
+
+
+def seq_scans(node: dict) -> Iterator[str]:
+    """
+    Перечисляет таблицы, читаемые последовательным сканированием.
+
+    Parameters
+    ----------
+    node : dict
+        Узел плана выполнения.
+
+    Returns
+    -------
+    Iterator[str]
+        Названия таблиц.
+    """
+    if node['Node Type'] == 'Seq Scan':
+        yield node['Relation Name']
+
+    for child in node.get('Plans', ()):
+        yield from seq_scans(child)
+
+
+def check_queries(connection: Connection, min_rows: int) -> list[str]:
+    """
+    Ищет последовательные сканирования больших таблиц в планах запросов.
+
+    Размер таблицы берется из статистики планировщика `pg_class.reltuples`,
+    поэтому на небольших таблицах, где последовательное сканирование
+    дешевле индекса, предупреждений нет.
+
+    Parameters
+    ----------
+    connection : Connection
+        Синхронное соединение с базой данных.
+    min_rows : int
+        Минимальный размер таблицы в строках для предупреждения.
+
+    Returns
+    -------
+    list[str]
+        Предупреждения вида `<запрос>: Seq Scan on <таблица> (~<строк> rows)`.
+    """
+    plans = {name: explain(connection, query) for name, query in _queries().items()}
+    scans = {name: set(seq_scans(plan)) for name, plan in plans.items()}
+
+    relations = set().union(*scans.values())
+    sizes = dict(connection.execute(
+        text(
+            'SELECT relname, GREATEST(reltuples, 0)::bigint FROM pg_class '
+            'WHERE relname = ANY(:relations)'
+        ),
+        {'relations': list(relations)}
+    ).all()) if relations else {}
+
+    return [
+        f'{name}: Seq Scan on {relation} (~{sizes.get(relation, 0)} rows)'
+        for name, scanned in scans.items()
+        for relation in sorted(scanned)
+        if sizes.get(relation, 0) >= min_rows
+    ]
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Проверяет планы запросов приложения и завершается с кодом 1 при
+    последовательных сканированиях больших таблиц.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        Аргументы командной строки, по умолчанию `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(prog='python -m url_shortener.db.advisor')
+    parser.add_argument(
+        '--min-rows',
+        type=int,
+        default=INDEX_ADVISOR_MIN_ROWS,
+        help='Минимальный размер таблицы для предупреждения, по умолчанию INDEX_ADVISOR_MIN_ROWS.'
+    )
+    args = parser.parse_args(argv)
+
+    with sync_engine.connect() as connection:
+        warnings = check_queries(connection, args.min_rows)
+
+    for warning in warnings:
+        print(warning)
+    if warnings:
+        sys.exit(1)
+
+    print('No sequential scans on large tables.')
+
+
+if __name__ == '__main__':
+    main()
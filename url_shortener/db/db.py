@@ -1,4 +1,5 @@
 from typing import AsyncGenerator
+from uuid import uuid4
 from fastapi import Depends
 from fastapi_users.db import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import (
@@ -8,14 +9,71 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from url_shortener.config import ASYNC_DATABASE_URL, SYNC_DATABASE_URL
+from url_shortener.config import (
+    ASYNC_DATABASE_URL,
+    SYNC_DATABASE_URL,
+    REPLICA_DATABASE_URLS,
+    DB_REPLICA_MAX_LAG,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_PGBOUNCER_MODE
+)
 from .models import Base, User
+from .pool import TimedQueuePool, TimedAsyncAdaptedQueuePool
+from .replicas import ReplicaRouter
+
+
+POOL_OPTIONS = {
+    'pool_size': DB_POOL_SIZE,
+    'max_overflow': DB_MAX_OVERFLOW,
+    'pool_timeout': DB_POOL_TIMEOUT,
+    'pool_recycle': DB_POOL_RECYCLE,
+    'pool_pre_ping': DB_POOL_PRE_PING
+}
 
+if DB_PGBOUNCER_MODE:
+    # В режиме пулинга транзакций PgBouncer соединение с сервером меняется
+    # между транзакциями, поэтому подготовленные выражения не кэшируются,
+    # а их имена не должны повторяться.
+    ASYNC_CONNECT_ARGS = {
+        'statement_cache_size': 0,
+        'prepared_statement_cache_size': 0,
+        'prepared_statement_name_func': lambda: f'__asyncpg_{uuid4()}__'
+    }
+else:
+    ASYNC_CONNECT_ARGS = {
+        'statement_cache_size': DB_STATEMENT_CACHE_SIZE,
+        'prepared_statement_cache_size': DB_STATEMENT_CACHE_SIZE
+    }
 
-async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncAdaptedQueuePool,
+    connect_args=ASYNC_CONNECT_ARGS,
+    **POOL_OPTIONS
+)
 async_session = async_sessionmaker(async_engine, expire_on_commit=False)
-sync_engine = create_engine(SYNC_DATABASE_URL)
+sync_engine = create_engine(
+    SYNC_DATABASE_URL,
+    poolclass=TimedQueuePool,
+    **POOL_OPTIONS
+)
 sync_session = sessionmaker(sync_engine, expire_on_commit=False)
+replica_engines = [
+    create_async_engine(
+        url,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        connect_args=ASYNC_CONNECT_ARGS,
+        **POOL_OPTIONS
+    )
+    for url in REPLICA_DATABASE_URLS
+]
+replica_router = ReplicaRouter(async_engine, replica_engines, max_lag=DB_REPLICA_MAX_LAG)
 
 
 async def create_db_and_tables():
@@ -39,6 +97,26 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def read_session(primary: bool = False) -> AsyncSession:
+    """
+    Создает сессию для запросов только на чтение.
+
+    Без реплик и при отставании всех реплик сессия открывается на основном
+    сервере.
+
+    Parameters
+    ----------
+    primary : bool, optional
+        Читать с основного сервера, например сразу после записи, по умолчанию False.
+
+    Returns
+    -------
+    AsyncSession
+        Асинхронная сессия базы данных.
+    """
+    return replica_router.session(primary=primary)
+
+
 async def get_user_db(
         session: AsyncSession = Depends(get_async_session)
 ) -> AsyncGenerator[SQLAlchemyUserDatabase, None]:
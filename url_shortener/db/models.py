@@ -1,14 +1,33 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
-from sqlalchemy import func, DateTime, String, ForeignKey, Text
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy import (
+    event,
+    func,
+    true,
+    false,
+    DateTime,
+    String,
+    ForeignKey,
+    Text,
+    Sequence,
+    Index,
+    DDL
+)
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
+from url_shortener.config import LIFETIME
 
 
 class Base(DeclarativeBase):
     pass
 
 
+alias_block_seq = Sequence('alias_block_seq', metadata=Base.metadata)
+
+LINK_LIFETIME = timedelta(seconds=LIFETIME)
+
+
 class User(SQLAlchemyBaseUserTableUUID, Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
@@ -33,6 +52,11 @@ class CurrentURLs(Base):
         Text,
         nullable=False
     )
+    url_hash: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        index=True,
+        nullable=True
+    )
     alias: Mapped[str] = mapped_column(
         String(255),
         unique=True,
@@ -45,6 +69,7 @@ class CurrentURLs(Base):
     )
     expire_at: Mapped[datetime] = mapped_column(
         DateTime,
+        index=True,
         nullable=False
     )
     clicks_count: Mapped[int] = mapped_column(
@@ -58,11 +83,53 @@ class CurrentURLs(Base):
         String(255),
         nullable=True
     )
-    celery_task_id: Mapped[int] = mapped_column(
-        String(255),
+    dedupe: Mapped[bool] = mapped_column(
+        server_default=false(),
+        default=False,
         nullable=False
     )
 
+    __table_args__ = (
+        # Страницы и выгрузка URL проекта по ключу `id`.
+        Index('ix_current_urls_user_id_project_name_id', 'user_id', 'project_name', 'id'),
+        # Один живой дедуплицируемый URL на пару (владелец, проект).
+        Index(
+            'uq_current_urls_dedupe',
+            'url_hash',
+            'user_id',
+            'project_name',
+            unique=True,
+            postgresql_where=dedupe == true(),
+            postgresql_nulls_not_distinct=True
+        ),
+    )
+
+    @hybrid_property
+    def effective_expire_at(self) -> datetime:
+        """
+        Фактический срок действия URL с учетом последнего клика.
+
+        Каждый клик продлевает URL на `LIFETIME` от момента клика, но
+        `expire_at` обновляется лишь при сдвиге больше порога, поэтому
+        фактический срок вычисляется как
+        `max(expire_at, last_clicked_at + LIFETIME)`.
+
+        Returns
+        -------
+        datetime
+            Время истечения срока действия URL.
+        """
+        if self.last_clicked_at is None:
+            return self.expire_at
+
+        return max(self.expire_at, self.last_clicked_at + LINK_LIFETIME)
+
+    @effective_expire_at.inplace.expression
+    @classmethod
+    def _effective_expire_at_expression(cls):
+        # GREATEST в Postgres пропускает NULL, если last_clicked_at не задан.
+        return func.greatest(cls.expire_at, cls.last_clicked_at + LINK_LIFETIME)
+
 
 class DeletedURLs(Base):
     __tablename__ = 'deleted_urls'
@@ -92,6 +159,7 @@ class DeletedURLs(Base):
     )
     expired_at: Mapped[datetime] = mapped_column(
         DateTime,
+        primary_key=True,
         nullable=False
     )
     clicks_count: Mapped[int] = mapped_column(
@@ -105,3 +173,40 @@ class DeletedURLs(Base):
         String(255),
         nullable=True
     )
+
+    # Таблица секционирована по месяцам `expired_at`, старые секции
+    # архивируются и удаляются задачей `archive_deleted_urls`.
+    __table_args__ = (
+        Index('ix_deleted_urls_user_id_id', 'user_id', 'id'),
+        {'postgresql_partition_by': 'RANGE (expired_at)'}
+    )
+
+
+# Секция по умолчанию принимает строки, для месяца которых секция еще не создана.
+event.listen(
+    DeletedURLs.__table__,
+    'after_create',
+    DDL('CREATE TABLE deleted_urls_default PARTITION OF deleted_urls DEFAULT')
+)
+
+
+class ClickRollups(Base):
+    __tablename__ = 'click_rollups'
+
+    url_id: Mapped[int] = mapped_column(
+        primary_key=True,
+        nullable=False
+    )
+    granularity: Mapped[str] = mapped_column(
+        String(8),
+        primary_key=True,
+        nullable=False
+    )
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime,
+        primary_key=True,
+        nullable=False
+    )
+    clicks: Mapped[int] = mapped_column(
+        default=0
+    )
@@ -0,0 +1,196 @@
+import re
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text, Connection
+
+
+DELETED_URLS_TABLE = 'deleted_urls'
+DELETED_URLS_DEFAULT_PARTITION = 'deleted_urls_default'
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def month_start(moment: datetime) -> datetime:
+    """
+    Округляет время вниз до начала месяца.
+
+    Parameters
+    ----------
+    moment : datetime
+        Исходное время.
+
+    Returns
+    -------
+    datetime
+        Начало месяца, содержащего исходное время.
+    """
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(moment: datetime) -> datetime:
+    """
+    Возвращает начало следующего месяца.
+
+    Parameters
+    ----------
+    moment : datetime
+        Исходное время.
+
+    Returns
+    -------
+    datetime
+        Начало месяца, следующего за месяцем исходного времени.
+    """
+    start = month_start(moment)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(start: datetime) -> str:
+    """
+    Возвращает имя месячной секции таблицы удаленных URL.
+
+    Parameters
+    ----------
+    start : datetime
+        Начало месяца.
+
+    Returns
+    -------
+    str
+        Имя секции, например `deleted_urls_y2025m05`.
+    """
+    return f'{DELETED_URLS_TABLE}_y{start.year}m{start.month:02d}'
+
+
+def create_partition(connection: Connection, start: datetime) -> str:
+    """
+    Создает месячную секцию таблицы удаленных URL.
+
+    Строки этого месяца, попавшие в секцию по умолчанию, переносятся в новую
+    секцию до ее подключения, иначе Postgres не позволит ее подключить.
+
+    Parameters
+    ----------
+    connection : Connection
+        Соединение с базой данных внутри транзакции.
+    start : datetime
+        Начало месяца.
+
+    Returns
+    -------
+    str
+        Имя созданной секции.
+    """
+    name = partition_name(start)
+    end = next_month(start)
+    connection.execute(text(
+        f'CREATE TABLE {name} (LIKE {DELETED_URLS_TABLE} INCLUDING DEFAULTS)'
+    ))
+    connection.execute(
+        text(
+            f'WITH moved AS ('
+            f'DELETE FROM {DELETED_URLS_DEFAULT_PARTITION} '
+            f'WHERE expired_at >= :start AND expired_at < :end RETURNING *'
+            f') INSERT INTO {name} SELECT * FROM moved'
+        ),
+        {'start': start, 'end': end}
+    )
+    connection.execute(text(
+        f'ALTER TABLE {DELETED_URLS_TABLE} ATTACH PARTITION {name} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return name
+
+
+def ensure_partitions(connection: Connection, now: datetime, ahead: int) -> list[str]:
+    """
+    Создает недостающие секции до конца `ahead`-го месяца после текущего.
+
+    Новые секции продолжают последнюю существующую, поэтому уже покрытые
+    месяцы, в том числе секцией с данными до секционирования, пропускаются.
+    Если в секции по умолчанию есть строки прошлых месяцев, например пока
+    задача не запускалась, секции создаются начиная с самого старого из них,
+    и строки переносятся в эти секции.
+
+    Parameters
+    ----------
+    connection : Connection
+        Соединение с базой данных внутри транзакции.
+    now : datetime
+        Текущее время в UTC.
+    ahead : int
+        Количество месяцев, секции которых создаются заранее.
+
+    Returns
+    -------
+    list[str]
+        Имена созданных секций.
+    """
+    end = month_start(now)
+    for _ in range(ahead + 1):
+        end = next_month(end)
+
+    oldest = connection.scalar(text(
+        f'SELECT min(expired_at) FROM {DELETED_URLS_DEFAULT_PARTITION}'
+    ))
+    start = month_start(now if oldest is None else min(oldest, now))
+
+    # Секции непрерывны, поэтому в секции по умолчанию только строки
+    # не раньше верхней границы последней секции.
+    bounds = [upper for _, upper in list_partitions(connection) if upper is not None]
+    start = max([start, *bounds])
+
+    created = []
+    while start < end:
+        created.append(create_partition(connection, start))
+        start = next_month(start)
+
+    return created
+
+
+def list_partitions(connection: Connection) -> list[tuple[str, Optional[datetime]]]:
+    """
+    Возвращает секции таблицы удаленных URL и их верхние границы.
+
+    Parameters
+    ----------
+    connection : Connection
+        Соединение с базой данных.
+
+    Returns
+    -------
+    list[tuple[str, Optional[datetime]]]
+        Имя секции и ее верхняя граница (не включительно), None для секции
+        по умолчанию.
+    """
+    query_result = connection.execute(text(
+        'SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) '
+        'FROM pg_inherits '
+        'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+        f"WHERE pg_inherits.inhparent = '{DELETED_URLS_TABLE}'::regclass "
+        'ORDER BY child.relname'
+    ))
+
+    partitions = []
+    for name, bound in query_result.all():
+        match = _UPPER_BOUND.search(bound)
+        partitions.append((name, datetime.fromisoformat(match.group(1)) if match else None))
+
+    return partitions
+
+
+def drop_partition(connection: Connection, name: str) -> None:
+    """
+    Отключает секцию от таблицы удаленных URL и удаляет ее.
+
+    Parameters
+    ----------
+    connection : Connection
+        Соединение с базой данных внутри транзакции.
+    name : str
+        Имя секции.
+    """
+    connection.execute(text(f'ALTER TABLE {DELETED_URLS_TABLE} DETACH PARTITION {name}'))
+    connection.execute(text(f'DROP TABLE {name}'))
@@ -0,0 +1,68 @@
+import time
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class WaitTimingMixin:
+    """
+    Примесь пула соединений, измеряющая время ожидания свободного соединения.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            self.wait_count += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class TimedQueuePool(WaitTimingMixin, QueuePool):
+    """
+    Синхронный пул соединений с измерением времени ожидания.
+    """
+
+
+class TimedAsyncAdaptedQueuePool(WaitTimingMixin, AsyncAdaptedQueuePool):
+    """
+    Асинхронный пул соединений с измерением времени ожидания.
+    """
+
+
+def get_pool_stats(engine: Engine | AsyncEngine) -> dict:
+    """
+    Возвращает показатели пула соединений движка.
+
+    Parameters
+    ----------
+    engine : Engine | AsyncEngine
+        Движок базы данных.
+
+    Returns
+    -------
+    dict
+        Размер пула, число выданных, свободных и сверхлимитных соединений,
+        а также количество, суммарное и максимальное время ожиданий
+        соединения в секундах.
+    """
+    pool = engine.pool
+
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'wait_count': getattr(pool, 'wait_count', 0),
+        'wait_seconds_total': getattr(pool, 'wait_seconds_total', 0.0),
+        'wait_seconds_max': getattr(pool, 'wait_seconds_max', 0.0)
+    }
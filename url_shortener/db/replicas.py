@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+import logging
+import math
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах. Если реплика воспроизвела весь полученный WAL,
+# отставание считается нулевым, иначе — по времени последней воспроизведенной транзакции.
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Распределяет запросы только на чтение между репликами базы данных.
+
+    Отставание реплик периодически проверяется, запросы направляются
+    по кругу на реплики с отставанием не больше `max_lag`. Пока отставание
+    не проверено, а также если подходящих реплик нет, используется
+    основной сервер.
+
+    Parameters
+    ----------
+    primary : AsyncEngine
+        Движок основного сервера.
+    replicas : list[AsyncEngine]
+        Движки реплик.
+    max_lag : float
+        Допустимое отставание реплики в секундах.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: list[AsyncEngine], max_lag: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.lags = {replica: math.inf for replica in replicas}
+
+        self._counter = itertools.count()
+
+    def choose(self) -> AsyncEngine:
+        """
+        Выбирает движок для запроса только на чтение.
+
+        Returns
+        -------
+        AsyncEngine
+            Движок реплики или основного сервера.
+        """
+        candidates = [replica for replica, lag in self.lags.items() if lag <= self.max_lag]
+        if not candidates:
+            return self.primary
+
+        return candidates[next(self._counter) % len(candidates)]
+
+    def session(self, primary: bool = False) -> AsyncSession:
+        """
+        Создает сессию для запросов только на чтение.
+
+        Parameters
+        ----------
+        primary : bool, optional
+            Использовать основной сервер, по умолчанию False.
+
+        Returns
+        -------
+        AsyncSession
+            Асинхронная сессия базы данных.
+        """
+        bind = self.primary if primary else self.choose()
+        return AsyncSession(bind, expire_on_commit=False)
+
+    async def _lag(self, replica: AsyncEngine) -> float:
+        async with replica.connect() as connection:
+            lag = await connection.scalar(LAG_QUERY)
+        return float(lag)
+
+    async def check(self, timeout: float) -> None:
+        """
+        Обновляет отставание реплик.
+
+        Недоступные и не ответившие за `timeout` секунд реплики исключаются
+        до следующей проверки.
+
+        Parameters
+        ----------
+        timeout : float
+            Время ожидания ответа реплики в секундах.
+        """
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._lag(replica), timeout) for replica in self.replicas),
+            return_exceptions=True
+        )
+        for replica, result in zip(self.replicas, results):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    f'Replica {replica.url.host} lag check failed: {result!r}'
+                )
+                result = math.inf
+            self.lags[replica] = result
+
+    async def run(self, interval: float) -> None:
+        """
+        Периодически проверяет отставание реплик.
+
+        Parameters
+        ----------
+        interval : float
+            Интервал между проверками в секундах.
+        """
+        if not self.replicas:
+            return
+
+        while True:
+            try:
+                await self.check(timeout=interval)
+            except Exception:
+                logger.exception('Failed to check replica lag.')
+            await asyncio.sleep(interval)
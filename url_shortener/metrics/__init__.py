@@ -0,0 +1,22 @@
+from .metrics import (
+    span,
+    record_cache,
+    record_dropped_clicks,
+    set_click_buffer_size,
+    sample_pool,
+    run_pool_sampler
+)
+from .middleware import MetricsMiddleware
+from .router import router_metrics
+
+
+__all__ = [
+    'span',
+    'record_cache',
+    'record_dropped_clicks',
+    'set_click_buffer_size',
+    'sample_pool',
+    'run_pool_sampler',
+    'MetricsMiddleware',
+    'router_metrics'
+]
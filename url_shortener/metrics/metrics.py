@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from functools import lru_cache
+from prometheus_client import Counter, Gauge, Histogram
+from url_shortener.db import async_engine, replica_router, get_pool_stats
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Длительность обработки HTTP-запроса.',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_DURATION = Histogram(
+    'stage_duration_seconds',
+    'Длительность этапа обработки запроса.',
+    ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Обращения к кэшу по результату.',
+    ['cache', 'result']
+)
+
+DB_POOL_SIZE = Gauge(
+    'db_pool_size',
+    'Размер пула соединений.',
+    multiprocess_mode='livesum'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out',
+    'Выданные соединения пула.',
+    multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow',
+    'Соединения сверх размера пула.',
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAITS = Gauge(
+    'db_pool_waits',
+    'Количество получений соединения из пула с момента запуска процесса.',
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAIT_SECONDS = Gauge(
+    'db_pool_wait_seconds',
+    'Суммарное время ожидания соединения с момента запуска процесса.',
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAIT_SECONDS_MAX = Gauge(
+    'db_pool_wait_seconds_max',
+    'Максимальное время ожидания соединения.',
+    multiprocess_mode='livemax'
+)
+CLICK_BUFFER_SIZE = Gauge(
+    'click_buffer_size',
+    'Количество алиасов и поминутных счетчиков в буфере кликов.',
+    ['kind'],
+    multiprocess_mode='livesum'
+)
+CLICKS_DROPPED = Counter(
+    'clicks_dropped_total',
+    'Клики, не поместившиеся в буфер: целиком или только во временной ряд.',
+    ['target']
+)
+DB_REPLICA_LAG = Gauge(
+    'db_replica_lag_seconds',
+    'Отставание реплики по последней проверке, +Inf для недоступной реплики.',
+    ['replica'],
+    multiprocess_mode='livemax'
+)
+
+
+@lru_cache(maxsize=None)
+def _stage(stage: str):
+    return STAGE_DURATION.labels(stage)
+
+
+@lru_cache(maxsize=None)
+def _cache_result(cache: str, result: str):
+    return CACHE_REQUESTS.labels(cache, result)
+
+
+def span(stage: str):
+    """
+    Измеряет длительность этапа обработки запроса.
+
+    Используется как контекстный менеджер: `with span('redirect.resolve'): ...`.
+
+    Parameters
+    ----------
+    stage : str
+        Название этапа.
+
+    Returns
+    -------
+    Timer
+        Контекстный менеджер, записывающий длительность в гистограмму этапов.
+    """
+    return _stage(stage).time()
+
+
+def record_cache(cache: str, result: str) -> None:
+    """
+    Учитывает обращение к кэшу.
+
+    Parameters
+    ----------
+    cache : str
+        Название кэша.
+    result : str
+        Результат обращения, например 'hit' или 'miss'.
+    """
+    _cache_result(cache, result).inc()
+
+
+def record_dropped_clicks(target: str, clicks: int) -> None:
+    """
+    Учитывает клики, не поместившиеся в буфер кликов.
+
+    Parameters
+    ----------
+    target : str
+        'click', если клик отброшен целиком, или 'rollup', если он
+        не попал только во временной ряд.
+    clicks : int
+        Количество кликов.
+    """
+    CLICKS_DROPPED.labels(target).inc(clicks)
+
+
+def set_click_buffer_size(aliases: int, buckets: int) -> None:
+    """
+    Обновляет размер буфера кликов.
+
+    Parameters
+    ----------
+    aliases : int
+        Количество алиасов в буфере.
+    buckets : int
+        Количество поминутных счетчиков в буфере.
+    """
+    CLICK_BUFFER_SIZE.labels('aliases').set(aliases)
+    CLICK_BUFFER_SIZE.labels('buckets').set(buckets)
+
+
+def sample_pool() -> None:
+    """
+    Обновляет показатели пула соединений и отставание реплик базы данных.
+    """
+    stats = get_pool_stats(async_engine)
+
+    DB_POOL_SIZE.set(stats['size'])
+    DB_POOL_CHECKED_OUT.set(stats['checked_out'])
+    DB_POOL_OVERFLOW.set(stats['overflow'])
+    DB_POOL_WAITS.set(stats['wait_count'])
+    DB_POOL_WAIT_SECONDS.set(stats['wait_seconds_total'])
+    DB_POOL_WAIT_SECONDS_MAX.set(stats['wait_seconds_max'])
+
+    for replica, lag in replica_router.lags.items():
+        DB_REPLICA_LAG.labels(replica.url.host).set(lag)
+
+
+async def run_pool_sampler(interval: float) -> None:
+    """
+    Периодически обновляет показатели пула соединений.
+
+    Parameters
+    ----------
+    interval : float
+        Интервал между обновлениями в секундах.
+    """
+    while True:
+        try:
+            sample_pool()
+        except Exception:
+            logger.exception('Failed to sample database pool.')
+        await asyncio.sleep(interval)
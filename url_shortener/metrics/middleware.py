@@ -0,0 +1,46 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .metrics import REQUEST_DURATION
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, измеряющая длительность HTTP-запросов.
+
+    Запросы группируются по шаблону маршрута, а не по фактическому пути,
+    чтобы число рядов метрики не зависело от количества алиасов.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        Оборачиваемое ASGI-приложение.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            REQUEST_DURATION\
+                .labels(
+                    scope['method'],
+                    route.path if route is not None else 'unmatched',
+                    str(status_code)
+                )\
+                .observe(time.perf_counter() - started_at)
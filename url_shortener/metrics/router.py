@@ -0,0 +1,33 @@
+import os
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+
+
+router_metrics = APIRouter()
+
+
+@router_metrics.get('/metrics', include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Отдает метрики в текстовом формате Prometheus.
+
+    При запуске нескольких рабочих процессов метрики собираются из каталога
+    `PROMETHEUS_MULTIPROC_DIR` по всем процессам.
+
+    Returns
+    -------
+    Response
+        Метрики Prometheus.
+    """
+    registry = REGISTRY
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
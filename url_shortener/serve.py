@@ -0,0 +1,227 @@
+import argparse
+import os
+import shutil
+from gunicorn.app.base import BaseApplication
+from url_shortener.config import (
+    WEB_BIND,
+    WEB_WORKERS,
+    WEB_PRELOAD,
+    WEB_KEEPALIVE,
+    WEB_BACKLOG,
+    WEB_TIMEOUT,
+    WEB_GRACEFUL_TIMEOUT,
+    WEB_MAX_REQUESTS,
+    WORKER_CONCURRENCY,
+    METRICS_MULTIPROC_DIR
+)
+
+
+def cpu_count() -> int:
+    """
+    Возвращает количество доступных процессу ядер.
+
+    Учитывает привязку процесса к ядрам, например в контейнере с cpuset.
+
+    Returns
+    -------
+    int
+        Количество ядер.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def post_fork(server, worker) -> None:
+    """
+    Сбрасывает пулы соединений, унаследованные рабочим процессом от мастера.
+
+    Parameters
+    ----------
+    server : Arbiter
+        Мастер-процесс gunicorn.
+    worker : Worker
+        Рабочий процесс gunicorn.
+    """
+    from url_shortener.db import async_engine, sync_engine, replica_engines
+
+    async_engine.sync_engine.dispose(close=False)
+    sync_engine.dispose(close=False)
+    for replica_engine in replica_engines:
+        replica_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker) -> None:
+    """
+    Помечает метрики завершившегося рабочего процесса как неактуальные.
+
+    Parameters
+    ----------
+    server : Arbiter
+        Мастер-процесс gunicorn.
+    worker : Worker
+        Рабочий процесс gunicorn.
+    """
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def prepare_metrics_dir(path: str) -> None:
+    """
+    Готовит каталог метрик Prometheus для нескольких рабочих процессов.
+
+    Переменная окружения должна быть задана до импорта `prometheus_client`,
+    поэтому функция вызывается до загрузки приложения.
+
+    Parameters
+    ----------
+    path : str
+        Каталог метрик.
+    """
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = path
+
+
+class WebApplication(BaseApplication):
+    """
+    Приложение gunicorn с рабочими процессами uvicorn.
+
+    Parameters
+    ----------
+    options : dict
+        Настройки gunicorn.
+    """
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from url_shortener.app import app
+
+        return app
+
+
+def web_options(workers: int, bind: str, preload: bool) -> dict:
+    """
+    Формирует настройки gunicorn для веб-процессов.
+
+    Parameters
+    ----------
+    workers : int
+        Количество рабочих процессов.
+    bind : str
+        Адрес для прослушивания.
+    preload : bool
+        Загружать ли приложение в мастер-процессе до запуска рабочих.
+
+    Returns
+    -------
+    dict
+        Настройки gunicorn.
+    """
+    return {
+        'bind': bind,
+        'workers': workers,
+        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'preload_app': preload,
+        'keepalive': WEB_KEEPALIVE,
+        'backlog': WEB_BACKLOG,
+        'timeout': WEB_TIMEOUT,
+        'graceful_timeout': WEB_GRACEFUL_TIMEOUT,
+        'max_requests': WEB_MAX_REQUESTS,
+        'max_requests_jitter': WEB_MAX_REQUESTS // 10,
+        'post_fork': post_fork,
+        'child_exit': child_exit,
+        'accesslog': '-',
+        'errorlog': '-'
+    }
+
+
+def run_web(args: argparse.Namespace) -> None:
+    """
+    Запускает веб-сервер.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Аргументы командной строки.
+    """
+    workers = args.workers or WEB_WORKERS or cpu_count()
+    prepare_metrics_dir(METRICS_MULTIPROC_DIR)
+    WebApplication(web_options(workers, args.bind, args.preload)).run()
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    """
+    Запускает рабочий процесс Celery без планировщика.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Аргументы командной строки.
+    """
+    from url_shortener.celery_app import celery
+
+    concurrency = args.concurrency or WORKER_CONCURRENCY or cpu_count()
+    celery.worker_main([
+        'worker',
+        '--loglevel=INFO',
+        f'--concurrency={concurrency}'
+    ])
+
+
+def run_beat(args: argparse.Namespace) -> None:
+    """
+    Запускает планировщик периодических задач Celery.
+
+    Планировщик должен работать в единственном экземпляре.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Аргументы командной строки.
+    """
+    from url_shortener.celery_app import celery
+
+    celery.start(['beat', '--loglevel=INFO'])
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Запускает одну из ролей сервиса: веб-сервер, рабочий процесс или планировщик.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        Аргументы командной строки, по умолчанию `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(prog='python -m url_shortener.serve')
+    roles = parser.add_subparsers(dest='role', required=True)
+
+    web = roles.add_parser('web', help='Веб-сервер API (gunicorn + uvicorn).')
+    web.add_argument('--workers', type=int, default=0, help='По умолчанию WEB_WORKERS или число ядер.')
+    web.add_argument('--bind', default=WEB_BIND)
+    web.add_argument('--preload', action=argparse.BooleanOptionalAction, default=WEB_PRELOAD)
+    web.set_defaults(run=run_web)
+
+    worker = roles.add_parser('worker', help='Рабочий процесс Celery.')
+    worker.add_argument('--concurrency', type=int, default=0, help='По умолчанию WORKER_CONCURRENCY или число ядер.')
+    worker.set_defaults(run=run_worker)
+
+    beat = roles.add_parser('beat', help='Планировщик Celery beat.')
+    beat.set_defaults(run=run_beat)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
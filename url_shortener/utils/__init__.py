@@ -1,12 +1,89 @@
-from .utils import (
-    generate_alias,
-    search_url,
-    delete_redis_keys
+from .utils import search_url
+from .urls import normalize_url, url_fingerprint
+from .clicks import ClickBuffer, click_buffer
+from .local_cache import LocalCache, MISSING
+from .alias_filter import BloomFilter, AliasFilter, alias_filter
+from .url_cache import (
+    url_cache,
+    InvalidationPublisher,
+    invalidation_publisher,
+    resolve_url,
+    register_urls,
+    invalidate_url,
+    invalidate_urls,
+    listen_url_invalidations
+)
+from .cache_keys import (
+    alias_key,
+    stats_key,
+    project_key,
+    expired_key,
+    search_key,
+    link_keys,
+    link_versions,
+    stats_key_builder,
+    project_key_builder,
+    expired_key_builder,
+    search_key_builder
+)
+from .coder import CompactCoder, CacheFormatError
+from .caching import cached
+from .rate_limit import RateLimit, RateLimiter, rate_limiter, retry_after_header
+from .export import export_response
+from .aliases import (
+    encode_base62,
+    AliasGenerator,
+    SequenceAliasGenerator,
+    SnowflakeAliasGenerator,
+    HashAliasGenerator,
+    get_alias_generator,
+    alias_generator
 )
 
 
 __all__ = [
-    'generate_alias',
     'search_url',
-    'delete_redis_keys'
+    'normalize_url',
+    'url_fingerprint',
+    'ClickBuffer',
+    'click_buffer',
+    'LocalCache',
+    'MISSING',
+    'BloomFilter',
+    'AliasFilter',
+    'alias_filter',
+    'url_cache',
+    'InvalidationPublisher',
+    'invalidation_publisher',
+    'resolve_url',
+    'register_urls',
+    'invalidate_url',
+    'invalidate_urls',
+    'listen_url_invalidations',
+    'alias_key',
+    'stats_key',
+    'project_key',
+    'expired_key',
+    'search_key',
+    'link_keys',
+    'link_versions',
+    'stats_key_builder',
+    'project_key_builder',
+    'expired_key_builder',
+    'search_key_builder',
+    'CompactCoder',
+    'CacheFormatError',
+    'cached',
+    'RateLimit',
+    'RateLimiter',
+    'rate_limiter',
+    'retry_after_header',
+    'export_response',
+    'encode_base62',
+    'AliasGenerator',
+    'SequenceAliasGenerator',
+    'SnowflakeAliasGenerator',
+    'HashAliasGenerator',
+    'get_alias_generator',
+    'alias_generator'
 ]
@@ -0,0 +1,356 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+from collections.abc import Iterable
+from typing import Optional
+from sqlalchemy import select, text
+from fastapi_cache import FastAPICache
+from url_shortener.db import CurrentURLs, async_session
+from url_shortener.config import (
+    ALIAS_FILTER_CAPACITY,
+    ALIAS_FILTER_ERROR_RATE,
+    ALIAS_FILTER_CHANNEL,
+    ALIAS_FILTER_GENERATION_KEY,
+    EXPORT_BATCH_SIZE
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Номер поколения увеличивается и рассылается вместе с алиасами атомарно,
+# поэтому процесс, получивший не все рассылки, видит отставание поколения.
+PUBLISH_SCRIPT = """
+local generation = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', ARGV[1], '{"generation":' .. generation .. ',"aliases":' .. ARGV[2] .. '}')
+return generation
+"""
+
+
+class BloomFilter:
+    """
+    Фильтр Блума над строками.
+
+    Позиции битов вычисляются двойным хэшированием по 128-битному дайджесту
+    BLAKE2b, поэтому на одну проверку приходится одно вычисление хэша.
+
+    Parameters
+    ----------
+    capacity : int
+        Ожидаемое количество элементов.
+    error_rate : float
+        Допустимая доля ложноположительных ответов при `capacity` элементах.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest_value = hashlib\
+            .blake2b(key.encode(), digest_size=16)\
+            .digest()
+        first = int.from_bytes(digest_value[:8], 'little')
+        second = int.from_bytes(digest_value[8:], 'little') | 1
+
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        """
+        Добавляет строку в фильтр.
+
+        Parameters
+        ----------
+        key : str
+            Добавляемая строка.
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class AliasFilter:
+    """
+    Фильтр Блума алиасов текущих URL в памяти процесса.
+
+    Отрицательный ответ фильтра означает, что алиаса точно нет, и позволяет
+    не обращаться к базе данных. Фильтр строится из `current_urls`, новые
+    алиасы добавляются локально и рассылаются другим процессам через канал
+    Redis. Удаленные и истекшие алиасы остаются в фильтре до следующей
+    перестройки и дают лишь ложноположительные ответы. Пока фильтр
+    не построен, все алиасы считаются возможно существующими.
+
+    Рассылка может потеряться при ошибке Redis или разрыве подписки,
+    поэтому каждая рассылка увеличивает поколение в Redis. Отрицательному
+    ответу можно верить, только если фильтр получил все рассылки текущего
+    поколения (см. `synced`). Неотправленные рассылки повторяются в фоне.
+
+    Parameters
+    ----------
+    capacity : int
+        Минимальная емкость фильтра.
+    error_rate : float
+        Допустимая доля ложноположительных ответов.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ready = False
+        self.generation: Optional[int] = None
+
+        self._filter = BloomFilter(capacity, error_rate)
+        self._rebuilding: Optional[set[str]] = None
+        self._pending: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._scripts = {}
+
+    def _script(self, redis):
+        script = self._scripts.get(id(redis))
+        if script is None:
+            script = self._scripts[id(redis)] = redis.register_script(PUBLISH_SCRIPT)
+        return script
+
+    def synced(self, generation: Optional[int]) -> bool:
+        """
+        Проверяет, получил ли фильтр все рассылки алиасов.
+
+        Parameters
+        ----------
+        generation : Optional[int]
+            Поколение из ключа `ALIAS_FILTER_GENERATION_KEY` или None,
+            если Redis недоступен.
+
+        Returns
+        -------
+        bool
+            True, если фильтр построен и его поколение совпадает с поколением
+            в Redis, то есть отрицательному ответу фильтра можно верить.
+        """
+        return self.ready and generation is not None and generation == self.generation
+
+    def might_exist(self, alias: str) -> bool:
+        """
+        Проверяет, может ли алиас существовать.
+
+        Parameters
+        ----------
+        alias : str
+            Алиас короткого URL.
+
+        Returns
+        -------
+        bool
+            False, только если фильтр построен и алиаса в нем нет.
+        """
+        return not self.ready or alias in self._filter
+
+    def known(self, alias: str) -> bool:
+        """
+        Проверяет, есть ли алиас в построенном фильтре.
+
+        Parameters
+        ----------
+        alias : str
+            Алиас короткого URL.
+
+        Returns
+        -------
+        bool
+            True, если фильтр построен и алиас в нем, возможно, есть.
+        """
+        return self.ready and alias in self._filter
+
+    def add(self, aliases: Iterable[str]) -> None:
+        """
+        Добавляет алиасы в фильтр процесса.
+
+        Parameters
+        ----------
+        aliases : Iterable[str]
+            Алиасы коротких URL.
+        """
+        for alias in aliases:
+            self._filter.add(alias)
+            if self._rebuilding is not None:
+                self._rebuilding.add(alias)
+
+    def publish(self, aliases: Iterable[str]) -> None:
+        """
+        Добавляет созданные алиасы в фильтр процесса и в очередь рассылки.
+
+        Parameters
+        ----------
+        aliases : Iterable[str]
+            Алиасы коротких URL.
+        """
+        aliases = list(aliases)
+        self.add(aliases)
+        self._pending.update(aliases)
+
+    async def flush(self) -> int:
+        """
+        Рассылает накопленные алиасы другим процессам.
+
+        При ошибке алиасы возвращаются в очередь рассылки.
+
+        Returns
+        -------
+        int
+            Количество разосланных алиасов.
+        """
+        if not self._pending:
+            return 0
+
+        batch, self._pending = list(self._pending), set()
+
+        redis = FastAPICache\
+            .get_backend()\
+            .redis
+        try:
+            await self._script(redis)(
+                keys=[ALIAS_FILTER_GENERATION_KEY],
+                args=[ALIAS_FILTER_CHANNEL, json.dumps(batch)]
+            )
+        except Exception:
+            self._pending.update(batch)
+            raise
+
+        return len(batch)
+
+    async def run_publisher(self, interval: float) -> None:
+        """
+        Периодически повторяет рассылки, не отправленные из-за ошибок Redis.
+
+        Parameters
+        ----------
+        interval : float
+            Интервал между попытками в секундах.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Failed to publish aliases to the alias filter.')
+
+    async def rebuild(self) -> int:
+        """
+        Строит фильтр заново по таблице `current_urls`.
+
+        Алиасы, добавленные во время построения, переносятся в новый фильтр.
+        Поколение читается до чтения таблицы: алиасы более поздних поколений
+        приходят рассылкой.
+
+        Returns
+        -------
+        int
+            Количество алиасов в таблице.
+        """
+        async with self._lock:
+            self._rebuilding = set()
+            try:
+                redis = FastAPICache\
+                    .get_backend()\
+                    .redis
+                try:
+                    generation = int(await redis.get(ALIAS_FILTER_GENERATION_KEY) or 0)
+                except Exception:
+                    logger.warning('Error retrieving alias filter generation from Redis:', exc_info=True)
+                    generation = None
+
+                async with async_session() as session:
+                    estimate = await session.scalar(text(
+                        "SELECT reltuples::bigint FROM pg_class "
+                        "WHERE oid = 'current_urls'::regclass"
+                    ))
+                    bloom = BloomFilter(
+                        max(self.capacity, 2 * (estimate or 0)),
+                        self.error_rate
+                    )
+
+                    count = 0
+                    query_result = await session.stream(
+                        select(CurrentURLs.alias)
+                        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+                    )
+                    async for partition in query_result.partitions():
+                        for alias, in partition:
+                            bloom.add(alias)
+                        count += len(partition)
+
+                for alias in self._rebuilding:
+                    bloom.add(alias)
+                self._filter = bloom
+                # Подписка могла уже получить рассылки новее прочитанного поколения.
+                if self.ready and None not in (generation, self.generation):
+                    generation = max(generation, self.generation)
+                self.generation = generation
+                self.ready = True
+            finally:
+                self._rebuilding = None
+
+        return count
+
+    async def listen(self, redis) -> None:
+        """
+        Строит фильтр и добавляет в него алиасы, созданные другими процессами.
+
+        Фильтр строится после подписки на канал, поэтому алиасы, созданные
+        во время построения, не теряются. При потере соединения фильтр
+        перестает отклонять алиасы до повторного построения. Поколение
+        фильтра продвигается по полученным рассылкам.
+
+        Parameters
+        ----------
+        redis : Redis
+            Асинхронный клиент Redis.
+        """
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(ALIAS_FILTER_CHANNEL)
+                await self.rebuild()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        data = json.loads(message['data'])
+                        self.add(data['aliases'])
+                        self.generation = max(self.generation or 0, data['generation'])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Alias filter subscription failed.')
+                self.ready = False
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+
+    async def run(self, interval: float) -> None:
+        """
+        Периодически перестраивает фильтр, вычищая удаленные алиасы.
+
+        Parameters
+        ----------
+        interval : float
+            Интервал между перестройками в секундах.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception('Failed to rebuild alias filter.')
+
+
+alias_filter = AliasFilter(
+    capacity=ALIAS_FILTER_CAPACITY,
+    error_rate=ALIAS_FILTER_ERROR_RATE
+)
@@ -0,0 +1,337 @@
+import asyncio
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_cache import FastAPICache
+from url_shortener.db import alias_block_seq
+from url_shortener.config import (
+    ALIAS_STRATEGY,
+    ALIAS_SEQUENCE_BACKEND,
+    ALIAS_BLOCK_SIZE,
+    ALIAS_MIN_LENGTH,
+    ALIAS_WORKER_ID,
+    ALIAS_ALLOCATION_ATTEMPTS
+)
+from .alias_filter import alias_filter
+
+
+BASE62_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+RESERVED_ALIASES = frozenset({'search'})
+
+
+def encode_base62(number: int, min_length: int = 0) -> str:
+    """
+    Кодирует неотрицательное число в строку base62.
+
+    Parameters
+    ----------
+    number : int
+        Кодируемое число.
+    min_length : int, optional
+        Минимальная длина результата, короткие строки дополняются нулями слева.
+
+    Returns
+    -------
+    str
+        Число в кодировке base62.
+    """
+    if number < 0:
+        raise ValueError('Only non-negative numbers can be encoded.')
+
+    digits = []
+    while True:
+        number, remainder = divmod(number, 62)
+        digits.append(BASE62_ALPHABET[remainder])
+        if number == 0:
+            break
+
+    return ''.join(reversed(digits)).rjust(min_length, '0')
+
+
+class AliasGenerator(ABC):
+    """
+    Базовый класс стратегии генерации алиасов.
+    """
+
+    @abstractmethod
+    async def _next(self, session: AsyncSession, url: str) -> str:
+        """
+        Генерирует очередной алиас без проверки зарезервированных алиасов.
+        """
+
+    async def allocate(self, session: AsyncSession, url: str) -> str:
+        """
+        Выделяет алиас для указанного URL.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            Асинхронная сессия базы данных.
+        url : str
+            Оригинальный URL.
+
+        Returns
+        -------
+        str
+            Сгенерированный алиас.
+        """
+        alias = await self._next(session, url)
+        while alias in RESERVED_ALIASES:
+            alias = await self._next(session, url)
+
+        return alias
+
+    async def allocate_many(self, session: AsyncSession, urls: list[str]) -> list[str]:
+        """
+        Выделяет алиасы для списка URL.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            Асинхронная сессия базы данных.
+        urls : list[str]
+            Оригинальные URL.
+
+        Returns
+        -------
+        list[str]
+            Сгенерированные алиасы в порядке следования URL.
+        """
+        return [await self.allocate(session, url) for url in urls]
+
+
+class SequenceAliasGenerator(AliasGenerator):
+    """
+    Генерирует алиасы в base62 из монотонного счетчика.
+
+    Процесс арендует у Postgres или Redis блоки из `block_size` номеров и
+    выдает их без обращения к хранилищу, поэтому алиасы не пересекаются
+    между процессами и не требуют проверки на существование.
+
+    Parameters
+    ----------
+    backend : str
+        Хранилище счетчика блоков: 'postgres' или 'redis'.
+    block_size : int
+        Количество номеров в арендуемом блоке.
+    min_length : int
+        Минимальная длина алиаса.
+    """
+
+    redis_key = 'alias:block'
+
+    def __init__(self, backend: str, block_size: int, min_length: int):
+        if backend not in ('postgres', 'redis'):
+            raise ValueError(f"Unknown alias sequence backend '{backend}'.")
+
+        self.backend = backend
+        self.block_size = block_size
+        self.min_length = min_length
+
+        self._next_id = 0
+        self._end_id = 0
+        self._lock = asyncio.Lock()
+
+    async def _lease_block(self, session: AsyncSession) -> int:
+        """
+        Арендует номер следующего блока.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            Асинхронная сессия базы данных.
+
+        Returns
+        -------
+        int
+            Номер блока.
+        """
+        if self.backend == 'redis':
+            redis = FastAPICache\
+                .get_backend()\
+                .redis
+            return await redis.incr(self.redis_key)
+
+        query_result = await session.execute(select(alias_block_seq.next_value()))
+        return query_result.scalar_one()
+
+    async def _reserve(self, session: AsyncSession, count: int) -> range:
+        """
+        Резервирует до `count` подряд идущих номеров из текущего блока.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            Асинхронная сессия базы данных.
+        count : int
+            Требуемое количество номеров.
+
+        Returns
+        -------
+        range
+            Зарезервированные номера.
+        """
+        async with self._lock:
+            if self._next_id >= self._end_id:
+                block = await self._lease_block(session)
+                self._next_id = block * self.block_size
+                self._end_id = self._next_id + self.block_size
+
+            start = self._next_id
+            self._next_id = min(start + count, self._end_id)
+
+            return range(start, self._next_id)
+
+    async def _next(self, session: AsyncSession, url: str) -> str:
+        ids = await self._reserve(session, 1)
+        return encode_base62(ids[0], self.min_length)
+
+    async def allocate_many(self, session: AsyncSession, urls: list[str]) -> list[str]:
+        aliases = []
+        while len(aliases) < len(urls):
+            ids = await self._reserve(session, len(urls) - len(aliases))
+            aliases.extend(
+                alias for alias in (encode_base62(i, self.min_length) for i in ids)
+                if alias not in RESERVED_ALIASES
+            )
+
+        return aliases
+
+
+class SnowflakeAliasGenerator(AliasGenerator):
+    """
+    Генерирует упорядоченные по времени алиасы в стиле Snowflake.
+
+    Идентификатор состоит из 41 бита миллисекунд от собственной эпохи,
+    10 бит номера процесса и 12 бит счетчика внутри миллисекунды.
+
+    Parameters
+    ----------
+    worker_id : Optional[int]
+        Номер процесса от 0 до 1023, по умолчанию арендуется в Redis.
+    """
+
+    epoch_ms = 1735689600000
+    worker_bits = 10
+    sequence_bits = 12
+    redis_key = 'alias:worker'
+
+    def __init__(self, worker_id: Optional[int] = None):
+        self.worker_id = worker_id
+
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = asyncio.Lock()
+
+    async def _lease_worker_id(self) -> int:
+        """
+        Арендует номер процесса в Redis.
+
+        Returns
+        -------
+        int
+            Номер процесса.
+        """
+        redis = FastAPICache\
+            .get_backend()\
+            .redis
+        worker_id = await redis.incr(self.redis_key)
+
+        return worker_id % (1 << self.worker_bits)
+
+    async def _next(self, session: AsyncSession, url: str) -> str:
+        async with self._lock:
+            if self.worker_id is None:
+                self.worker_id = await self._lease_worker_id()
+
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms < self._last_ms:
+                now_ms = self._last_ms
+
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) % (1 << self.sequence_bits)
+                if self._sequence == 0:
+                    while now_ms <= self._last_ms:
+                        await asyncio.sleep(0.001)
+                        now_ms = time.time_ns() // 1_000_000
+            else:
+                self._sequence = 0
+
+            self._last_ms = now_ms
+
+            snowflake = (now_ms - self.epoch_ms) << (self.worker_bits + self.sequence_bits)\
+                | self.worker_id << self.sequence_bits\
+                | self._sequence
+
+        return encode_base62(snowflake)
+
+
+class HashAliasGenerator(AliasGenerator):
+    """
+    Генерирует алиасы в base62 из хэша URL со случайной солью.
+
+    Стратегия не исключает коллизии. Кандидаты, которые, возможно, уже
+    заняты по фильтру алиасов, заменяются без обращения к базе данных,
+    оставшиеся коллизии обнаруживаются уникальным индексом на `alias`
+    при вставке.
+
+    Parameters
+    ----------
+    length : int
+        Длина алиаса.
+    """
+
+    def __init__(self, length: int):
+        self.length = length
+
+    def _candidate(self, url: str) -> str:
+        digest_value = hashlib\
+            .sha256(url.encode() + os.urandom(8))\
+            .digest()
+        number = int.from_bytes(digest_value, 'big') % 62 ** self.length
+
+        return encode_base62(number, self.length)
+
+    async def _next(self, session: AsyncSession, url: str) -> str:
+        alias = self._candidate(url)
+        for _ in range(ALIAS_ALLOCATION_ATTEMPTS):
+            if not alias_filter.known(alias):
+                break
+            alias = self._candidate(url)
+
+        return alias
+
+
+def get_alias_generator(strategy: str = ALIAS_STRATEGY) -> AliasGenerator:
+    """
+    Создает генератор алиасов для указанной стратегии.
+
+    Parameters
+    ----------
+    strategy : str
+        Стратегия генерации: 'sequence', 'snowflake' или 'hash'.
+
+    Returns
+    -------
+    AliasGenerator
+        Генератор алиасов.
+    """
+    if strategy == 'sequence':
+        return SequenceAliasGenerator(
+            backend=ALIAS_SEQUENCE_BACKEND,
+            block_size=ALIAS_BLOCK_SIZE,
+            min_length=ALIAS_MIN_LENGTH
+        )
+    if strategy == 'snowflake':
+        return SnowflakeAliasGenerator(worker_id=ALIAS_WORKER_ID)
+    if strategy == 'hash':
+        return HashAliasGenerator(length=max(ALIAS_MIN_LENGTH, 8))
+
+    raise ValueError(f"Unknown alias strategy '{strategy}'.")
+
+
+alias_generator = get_alias_generator()
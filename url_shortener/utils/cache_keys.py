@@ -0,0 +1,290 @@
+import logging
+from typing import Awaitable, Callable, Optional
+from fastapi_cache import FastAPICache
+from url_shortener.config import CACHE_PREFIX
+from .urls import url_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = f'{CACHE_PREFIX}:url'
+VERSION_TTL = 24 * 60 * 60
+
+
+def alias_key(alias: str) -> str:
+    """
+    Формирует ключ Redis для оригинального URL по алиасу.
+
+    Parameters
+    ----------
+    alias : str
+        Алиас короткого URL.
+
+    Returns
+    -------
+    str
+        Ключ Redis.
+    """
+    return f'{NAMESPACE}:alias:{alias}'
+
+
+def stats_key(alias: str, user_id) -> str:
+    """
+    Формирует ключ Redis для статистики URL.
+
+    Parameters
+    ----------
+    alias : str
+        Алиас короткого URL.
+    user_id : UUID
+        ID владельца URL.
+
+    Returns
+    -------
+    str
+        Ключ Redis.
+    """
+    return f'{NAMESPACE}:stats:{user_id}:{alias}'
+
+
+def series_key(alias: str, user_id) -> str:
+    """
+    Формирует ключ Redis с версией временных рядов статистики URL.
+
+    Parameters
+    ----------
+    alias : str
+        Алиас короткого URL.
+    user_id : UUID
+        ID владельца URL.
+
+    Returns
+    -------
+    str
+        Ключ Redis.
+    """
+    return f'{NAMESPACE}:series:{user_id}:{alias}'
+
+
+def project_key(user_id, project_name: str) -> str:
+    """
+    Формирует ключ Redis с версией списка URL проекта.
+
+    Parameters
+    ----------
+    user_id : UUID
+        ID владельца проекта.
+    project_name : str
+        Название проекта.
+
+    Returns
+    -------
+    str
+        Ключ Redis.
+    """
+    return f'{NAMESPACE}:project:{user_id}:{project_name}'
+
+
+def expired_key(user_id) -> str:
+    """
+    Формирует ключ Redis с версией списка истекших URL пользователя.
+
+    Parameters
+    ----------
+    user_id : UUID
+        ID пользователя.
+
+    Returns
+    -------
+    str
+        Ключ Redis.
+    """
+    return f'{NAMESPACE}:expired:{user_id}'
+
+
+def search_key(url: str) -> str:
+    """
+    Формирует ключ Redis для результатов поиска по оригинальному URL.
+
+    Эквивалентные после нормализации URL имеют общий ключ.
+
+    Parameters
+    ----------
+    url : str
+        Оригинальный URL.
+
+    Returns
+    -------
+    str
+        Ключ Redis.
+    """
+    return f'{NAMESPACE}:search:{url_fingerprint(url)}'
+
+
+def link_keys(
+    alias: str,
+    user_id,
+    project_name: Optional[str],
+    urls: list[str]
+) -> list[str]:
+    """
+    Возвращает ключи Redis, зависящие от короткого URL.
+
+    Parameters
+    ----------
+    alias : str
+        Алиас короткого URL.
+    user_id : Optional[UUID]
+        ID владельца URL.
+    project_name : Optional[str]
+        Название проекта URL.
+    urls : list[str]
+        Оригинальные URL, с которыми был связан алиас.
+
+    Returns
+    -------
+    list[str]
+        Ключи Redis.
+    """
+    keys = [alias_key(alias)]
+    keys.extend(search_key(url) for url in urls)
+
+    if user_id is not None:
+        keys.append(stats_key(alias, user_id))
+
+    return keys
+
+
+def link_versions(alias: str, user_id, project_name: Optional[str]) -> list[str]:
+    """
+    Возвращает ключи версий значений, зависящих от короткого URL.
+
+    Страницы списков и временные ряды статистики кэшируются под ключами,
+    содержащими текущую версию, поэтому увеличение версии делает
+    недействительными все страницы и интервалы сразу.
+
+    Parameters
+    ----------
+    alias : str
+        Алиас короткого URL.
+    user_id : Optional[UUID]
+        ID владельца URL.
+    project_name : Optional[str]
+        Название проекта URL.
+
+    Returns
+    -------
+    list[str]
+        Ключи версий Redis.
+    """
+    if user_id is None:
+        return []
+
+    versions = [series_key(alias, user_id), expired_key(user_id)]
+    if project_name is not None:
+        versions.append(project_key(user_id, project_name))
+
+    return versions
+
+
+def key_builder(build: Callable[..., str]) -> Callable[..., str]:
+    """
+    Создает построитель ключей для декоратора `cache` из функции ключа.
+
+    Функция ключа получает именованные аргументы обработчика.
+
+    Parameters
+    ----------
+    build : Callable[..., str]
+        Функция, формирующая ключ из аргументов обработчика.
+
+    Returns
+    -------
+    Callable[..., str]
+        Построитель ключей в формате `fastapi_cache`.
+    """
+    def builder(func, namespace, *, request=None, response=None, args=(), kwargs=None):
+        return build(**kwargs)
+
+    return builder
+
+
+async def read_version(version_key: str) -> int:
+    """
+    Возвращает текущую версию по ключу версии.
+
+    Parameters
+    ----------
+    version_key : str
+        Ключ версии Redis.
+
+    Returns
+    -------
+    int
+        Версия, 0 если ключа нет или Redis недоступен: тогда недоступен и кэш,
+        и значение вычисляется заново.
+    """
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    try:
+        version = await redis.get(version_key)
+    except Exception:
+        logger.warning(f"Error retrieving version key '{version_key}':", exc_info=True)
+        return 0
+
+    return 0 if version is None else int(version)
+
+
+def page_key_builder(build: Callable[..., str]) -> Callable[..., Awaitable[str]]:
+    """
+    Создает построитель ключей страниц списка с учетом версии списка.
+
+    Parameters
+    ----------
+    build : Callable[..., str]
+        Функция, формирующая ключ версии списка из аргументов обработчика.
+
+    Returns
+    -------
+    Callable[..., Awaitable[str]]
+        Асинхронный построитель ключей в формате `fastapi_cache`.
+    """
+    async def builder(func, namespace, *, request=None, response=None, args=(), kwargs=None):
+        version_key = build(**kwargs)
+        version = await read_version(version_key)
+
+        return f"{version_key}:{version}:{kwargs.get('cursor')}:{kwargs.get('limit')}"
+
+    return builder
+
+
+async def stats_key_builder(func, namespace, *, request=None, response=None, args=(), kwargs=None):
+    """
+    Построитель ключей статистики URL.
+
+    Временные ряды кэшируются под ключами с версией рядов URL, поэтому
+    изменение, удаление и перенос URL делают недействительными все интервалы.
+    """
+    alias, user_id = kwargs['alias'], kwargs['user'].id
+    if kwargs.get('granularity') is None:
+        return stats_key(alias, user_id)
+
+    version = await read_version(series_key(alias, user_id))
+    return (
+        f"{stats_key(alias, user_id)}:{version}:"
+        f"{kwargs['granularity']}:{kwargs.get('start')}:{kwargs.get('end')}"
+    )
+
+
+project_key_builder = page_key_builder(
+    lambda project_name, user, **_: project_key(user.id, project_name)
+)
+expired_key_builder = page_key_builder(
+    lambda user, **_: expired_key(user.id)
+)
+search_key_builder = key_builder(
+    lambda original_url, **_: search_key(
+        original_url if original_url.startswith('https') else 'https://' + original_url
+    )
+)
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_cache import FastAPICache
+from url_shortener.db import async_engine
+from url_shortener.metrics import record_cache
+from url_shortener.config import CACHE_STALE_TTL
+from .coder import CacheFormatError
+
+
+logger = logging.getLogger(__name__)
+
+_inflight: dict[str, asyncio.Future] = {}
+_refreshing: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+# Результат вычисления, прерванного отменой запроса-лидера.
+_ABANDONED = object()
+
+
+def _pack(value: bytes, fresh_until: float) -> bytes:
+    return b'%d|' % int(fresh_until * 1000) + value
+
+
+def _unpack(cached: bytes) -> tuple[bytes, float]:
+    fresh_until, separator, value = cached.partition(b'|')
+    if not separator or not fresh_until.isdigit():
+        raise CacheFormatError('Cache entry has no freshness header.')
+    return value, int(fresh_until) / 1000
+
+
+async def _compute_and_store(
+    func: Callable[..., Awaitable[Any]],
+    key: str,
+    expire: int,
+    stale_ttl: int,
+    args: tuple,
+    kwargs: dict
+) -> Any:
+    """
+    Вычисляет значение обработчика и сохраняет его в Redis.
+
+    Parameters
+    ----------
+    func : Callable[..., Awaitable[Any]]
+        Кэшируемый обработчик.
+    key : str
+        Ключ Redis.
+    expire : int
+        Время, в течение которого значение считается свежим, в секундах.
+    stale_ttl : int
+        Время, в течение которого устаревшее значение еще отдается, в секундах.
+    args : tuple
+        Позиционные аргументы обработчика.
+    kwargs : dict
+        Именованные аргументы обработчика.
+
+    Returns
+    -------
+    Any
+        Результат обработчика.
+    """
+    result = await func(*args, **kwargs)
+
+    coder = FastAPICache.get_coder()
+    backend = FastAPICache.get_backend()
+    try:
+        await backend.set(
+            key,
+            _pack(coder.encode(result), time.time() + expire),
+            expire + stale_ttl
+        )
+    except Exception:
+        logger.warning(f"Error setting cache key '{key}' in backend:", exc_info=True)
+
+    return result
+
+
+async def _refresh(
+    func: Callable[..., Awaitable[Any]],
+    key: str,
+    expire: int,
+    stale_ttl: int,
+    args: tuple,
+    kwargs: dict
+) -> None:
+    """
+    Обновляет устаревшее значение в фоне.
+
+    Сессия базы данных запроса к этому моменту может быть закрыта, поэтому
+    обработчик вызывается с новой сессией. Между процессами обновление
+    координируется блокировкой в Redis.
+
+    Parameters
+    ----------
+    func : Callable[..., Awaitable[Any]]
+        Кэшируемый обработчик.
+    key : str
+        Ключ Redis.
+    expire : int
+        Время, в течение которого значение считается свежим, в секундах.
+    stale_ttl : int
+        Время, в течение которого устаревшее значение еще отдается, в секундах.
+    args : tuple
+        Позиционные аргументы обработчика.
+    kwargs : dict
+        Именованные аргументы обработчика.
+    """
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    try:
+        if not await redis.set(f'{key}:refresh', 1, nx=True, ex=max(stale_ttl, 1)):
+            return
+
+        # Сессия открывается на том же сервере, что и у исходного запроса:
+        # обработчики только на чтение обновляются с реплики.
+        bind = next(
+            (value.bind for value in kwargs.values() if isinstance(value, AsyncSession)),
+            async_engine
+        )
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            kwargs = {
+                name: session if isinstance(value, AsyncSession) else value
+                for name, value in kwargs.items()
+            }
+            await _compute_and_store(func, key, expire, stale_ttl, args, kwargs)
+    except Exception:
+        logger.warning(f"Error refreshing cache key '{key}':", exc_info=True)
+    finally:
+        _refreshing.discard(key)
+
+
+def cached(
+    expire: int,
+    namespace: str,
+    key_builder: Callable[..., Any],
+    stale_ttl: Optional[int] = None
+) -> Callable:
+    """
+    Кэширует результат обработчика в Redis с объединением запросов.
+
+    Одновременные промахи по одному ключу в процессе ожидают одно
+    вычисление. После истечения `expire` значение еще `stale_ttl` секунд
+    отдается как устаревшее, пока одно фоновое вычисление его обновляет.
+
+    Parameters
+    ----------
+    expire : int
+        Время, в течение которого значение считается свежим, в секундах.
+    namespace : str
+        Пространство имен ключей.
+    key_builder : Callable[..., Any]
+        Построитель ключей в формате `fastapi_cache`.
+    stale_ttl : Optional[int], optional
+        Время отдачи устаревшего значения в секундах, по умолчанию
+        `CACHE_STALE_TTL`.
+
+    Returns
+    -------
+    Callable
+        Декоратор обработчика.
+    """
+    if stale_ttl is None:
+        stale_ttl = CACHE_STALE_TTL
+
+    def wrapper(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            if not FastAPICache.get_enable():
+                return await func(*args, **kwargs)
+
+            key = key_builder(
+                func,
+                f'{FastAPICache.get_prefix()}:{namespace}',
+                request=None,
+                response=None,
+                args=args,
+                kwargs=kwargs
+            )
+            if asyncio.iscoroutine(key):
+                key = await key
+
+            try:
+                cached_value = await FastAPICache.get_backend().get(key)
+            except Exception:
+                logger.warning(f"Error retrieving cache key '{key}' from backend:", exc_info=True)
+                cached_value = None
+
+            decoded = None
+            if cached_value is not None:
+                try:
+                    value, fresh_until = _unpack(cached_value)
+                    decoded = FastAPICache.get_coder().decode(value)
+                except CacheFormatError:
+                    # Запись старого формата, в том числе записанная fastapi-cache
+                    # без заголовка свежести, перезаписывается как при промахе.
+                    cached_value = None
+
+            if cached_value is not None:
+                is_stale = fresh_until <= time.time()
+                record_cache(func.__name__, 'stale' if is_stale else 'hit')
+
+                if is_stale and key not in _refreshing:
+                    _refreshing.add(key)
+                    task = asyncio.create_task(
+                        _refresh(func, key, expire, stale_ttl, args, kwargs)
+                    )
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+
+                return decoded
+
+            while (inflight := _inflight.get(key)) is not None:
+                record_cache(func.__name__, 'coalesced')
+                result = await asyncio.shield(inflight)
+                if result is not _ABANDONED:
+                    return result
+
+            record_cache(func.__name__, 'miss')
+
+            inflight = asyncio.get_running_loop().create_future()
+            _inflight[key] = inflight
+            try:
+                result = await _compute_and_store(func, key, expire, stale_ttl, args, kwargs)
+            except Exception as error:
+                inflight.set_exception(error)
+                # Исключение уже передано ожидающим, подавляем предупреждение о нем.
+                inflight.exception()
+                raise
+            except BaseException:
+                # Отмена запроса-лидера, например при отключении клиента,
+                # не касается ожидающих: они вычисляют значение заново.
+                inflight.set_result(_ABANDONED)
+                raise
+            else:
+                inflight.set_result(result)
+            finally:
+                _inflight.pop(key, None)
+
+            return result
+
+        return inner
+
+    return wrapper
@@ -0,0 +1,322 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import (
+    update,
+    values,
+    column,
+    case,
+    func,
+    Integer,
+    String,
+    DateTime
+)
+from sqlalchemy.dialects.postgresql import insert
+from url_shortener.db import CurrentURLs, ClickRollups, async_session
+from url_shortener.db.models import LINK_LIFETIME
+from url_shortener.metrics import span, record_dropped_clicks, set_click_buffer_size
+from url_shortener.config import (
+    EXPIRY_EXTEND_THRESHOLD,
+    CLICKS_BUFFER_MAX_ALIASES,
+    CLICKS_BUFFER_MAX_BUCKETS
+)
+
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('minute', 'hour', 'day')
+# Ограничивает число параметров одного запроса (не более 32767 в Postgres).
+FLUSH_CHUNK_SIZE = 2000
+# Минимальный сдвиг срока действия, ради которого переписывается `expire_at`.
+EXPIRY_EXTEND_STEP = LINK_LIFETIME * EXPIRY_EXTEND_THRESHOLD
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """
+    Округляет время вниз до начала интервала агрегации.
+
+    Parameters
+    ----------
+    moment : datetime
+        Исходное время.
+    granularity : str
+        Интервал агрегации: 'minute', 'hour' или 'day'.
+
+    Returns
+    -------
+    datetime
+        Начало интервала, содержащего исходное время.
+    """
+    if granularity == 'minute':
+        return moment.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    raise ValueError(f"Unknown granularity '{granularity}'.")
+
+
+class ClickBuffer:
+    """
+    Буфер кликов по коротким URL с отложенной записью в базу данных.
+
+    Клики накапливаются в памяти процесса в виде счетчика и времени последнего
+    клика для каждого алиаса, а также поминутных счетчиков. Буфер периодически
+    записывается в таблицу `current_urls` одним пакетным запросом
+    `UPDATE ... FROM (VALUES ...)`, а поминутные счетчики агрегируются
+    в таблицу `click_rollups` по минутам, часам и дням.
+
+    Срок действия URL скользящий: `LIFETIME` от последнего клика. Индексируемый
+    `expire_at` переписывается, только если срок сдвигается больше чем на
+    долю `EXPIRY_EXTEND_THRESHOLD` от `LIFETIME`, остальные обновления
+    затрагивают лишь неиндексируемые столбцы.
+
+    При неудачной записи клики возвращаются в буфер. Чтобы долгая
+    недоступность базы данных не расходовала память без ограничений,
+    клики по новым алиасам сверх `max_aliases` отбрасываются, а сверх
+    `max_buckets` поминутных счетчиков не попадают во временной ряд.
+    Отброшенные клики учитываются в метрике `clicks_dropped_total`.
+
+    Parameters
+    ----------
+    max_aliases : int
+        Максимальное количество алиасов в буфере.
+    max_buckets : int
+        Максимальное количество поминутных счетчиков в буфере.
+    """
+
+    def __init__(self, max_aliases: int, max_buckets: int):
+        self.max_aliases = max_aliases
+        self.max_buckets = max_buckets
+        self._pending: dict[str, list] = {}
+        self._buckets: defaultdict[tuple[str, datetime], int] = defaultdict(int)
+
+    def record(self, alias: str, clicked_at: Optional[datetime] = None) -> None:
+        """
+        Регистрирует клик по алиасу.
+
+        Parameters
+        ----------
+        alias : str
+            Алиас короткого URL.
+        clicked_at : Optional[datetime], optional
+            Время клика, по умолчанию текущее время в UTC.
+        """
+        if clicked_at is None:
+            clicked_at = datetime\
+                .now(timezone.utc)\
+                .replace(tzinfo=None)
+
+        pending = self._pending.get(alias)
+        if pending is None:
+            if len(self._pending) >= self.max_aliases:
+                record_dropped_clicks('click', 1)
+                return
+            self._pending[alias] = [1, clicked_at]
+        else:
+            pending[0] += 1
+            pending[1] = max(pending[1], clicked_at)
+
+        bucket = (alias, truncate(clicked_at, 'minute'))
+        if bucket in self._buckets or len(self._buckets) < self.max_buckets:
+            self._buckets[bucket] += 1
+        else:
+            record_dropped_clicks('rollup', 1)
+
+    def _restore(
+        self,
+        batch: dict[str, list],
+        buckets: dict[tuple[str, datetime], int]
+    ) -> None:
+        """
+        Возвращает в буфер клики, которые не удалось записать.
+
+        Клики, не помещающиеся в буфер, отбрасываются как в `record`.
+
+        Parameters
+        ----------
+        batch : dict[str, list]
+            Клики, извлеченные из буфера при неудачной записи.
+        buckets : dict[tuple[str, datetime], int]
+            Поминутные счетчики, извлеченные из буфера при неудачной записи.
+        """
+        dropped = set()
+        for alias, (clicks, clicked_at) in batch.items():
+            pending = self._pending.get(alias)
+            if pending is None:
+                if len(self._pending) >= self.max_aliases:
+                    dropped.add(alias)
+                    record_dropped_clicks('click', clicks)
+                    continue
+                self._pending[alias] = [clicks, clicked_at]
+            else:
+                pending[0] += clicks
+                pending[1] = max(pending[1], clicked_at)
+
+        for bucket, clicks in buckets.items():
+            if bucket[0] in dropped:
+                continue
+            if bucket in self._buckets or len(self._buckets) < self.max_buckets:
+                self._buckets[bucket] += clicks
+            else:
+                record_dropped_clicks('rollup', clicks)
+
+        if dropped:
+            logger.warning(f'Click buffer is full, dropped clicks for {len(dropped)} aliases.')
+
+    @staticmethod
+    def _rollups(
+        buckets: dict[tuple[str, datetime], int],
+        url_ids: dict[str, int]
+    ) -> list[dict]:
+        """
+        Агрегирует поминутные счетчики по всем интервалам агрегации.
+
+        Parameters
+        ----------
+        buckets : dict[tuple[str, datetime], int]
+            Поминутные счетчики кликов по алиасам.
+        url_ids : dict[str, int]
+            ID текущих URL по алиасам.
+
+        Returns
+        -------
+        list[dict]
+            Строки для вставки в таблицу `click_rollups`.
+        """
+        rollups = defaultdict(int)
+        for (alias, minute), clicks in buckets.items():
+            url_id = url_ids.get(alias)
+            if url_id is None:
+                continue
+            for granularity in GRANULARITIES:
+                rollups[(url_id, granularity, truncate(minute, granularity))] += clicks
+
+        return [
+            {
+                'url_id': url_id,
+                'granularity': granularity,
+                'bucket_start': bucket_start,
+                'clicks': clicks
+            }
+            for (url_id, granularity, bucket_start), clicks in rollups.items()
+        ]
+
+    async def flush(self) -> int:
+        """
+        Записывает накопленные клики и их агрегаты в базу данных.
+
+        Returns
+        -------
+        int
+            Количество алиасов, для которых были записаны клики.
+        """
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        buckets, self._buckets = self._buckets, defaultdict(int)
+
+        rows = [
+            (alias, count, clicked_at)
+            for alias, (count, clicked_at) in batch.items()
+        ]
+
+        try:
+            async with async_session() as session:
+                url_ids = {}
+                for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                    query_result = await session.execute(
+                        self._update_query(rows[start:start + FLUSH_CHUNK_SIZE])
+                    )
+                    url_ids.update(query_result.all())
+
+                rollups = self._rollups(buckets, url_ids)
+                for start in range(0, len(rollups), FLUSH_CHUNK_SIZE):
+                    upsert = insert(ClickRollups).values(rollups[start:start + FLUSH_CHUNK_SIZE])
+                    upsert = upsert.on_conflict_do_update(
+                        index_elements=[
+                            ClickRollups.url_id,
+                            ClickRollups.granularity,
+                            ClickRollups.bucket_start
+                        ],
+                        set_={'clicks': ClickRollups.clicks + upsert.excluded.clicks}
+                    )
+                    await session.execute(upsert)
+
+                await session.commit()
+        except Exception:
+            self._restore(batch, buckets)
+            raise
+
+        return len(batch)
+
+    @staticmethod
+    def _update_query(rows: list[tuple[str, int, datetime]]):
+        """
+        Формирует пакетный запрос обновления счетчиков кликов.
+
+        Parameters
+        ----------
+        rows : list[tuple[str, int, datetime]]
+            Алиас, количество кликов и время последнего клика.
+
+        Returns
+        -------
+        Update
+            Запрос `UPDATE ... FROM (VALUES ...) RETURNING alias, id`.
+        """
+        clicks = values(
+            column('alias', String),
+            column('clicks', Integer),
+            column('last_clicked_at', DateTime),
+            name='clicks'
+        ).data(rows)
+        extended_expire_at = clicks.c.last_clicked_at + LINK_LIFETIME
+
+        return update(CurrentURLs)\
+            .where(CurrentURLs.alias == clicks.c.alias)\
+            .values(
+                clicks_count=CurrentURLs.clicks_count + clicks.c.clicks,
+                last_clicked_at=func.greatest(
+                    CurrentURLs.last_clicked_at,
+                    clicks.c.last_clicked_at
+                ),
+                expire_at=case(
+                    (
+                        extended_expire_at - CurrentURLs.expire_at > EXPIRY_EXTEND_STEP,
+                        extended_expire_at
+                    ),
+                    else_=CurrentURLs.expire_at
+                )
+            )\
+            .returning(CurrentURLs.alias, CurrentURLs.id)\
+            .execution_options(synchronize_session=False)
+
+    async def run(self, interval: float) -> None:
+        """
+        Периодически сбрасывает буфер в базу данных.
+
+        Parameters
+        ----------
+        interval : float
+            Интервал между сбросами буфера в секундах.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                with span('clicks.flush'):
+                    await self.flush()
+            except Exception:
+                logger.exception('Failed to flush click buffer.')
+            finally:
+                set_click_buffer_size(len(self._pending), len(self._buckets))
+
+
+click_buffer = ClickBuffer(
+    max_aliases=CLICKS_BUFFER_MAX_ALIASES,
+    max_buckets=CLICKS_BUFFER_MAX_BUCKETS
+)
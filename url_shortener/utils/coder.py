@@ -0,0 +1,110 @@
+from typing import Any
+import orjson
+from fastapi_cache.coder import Coder
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import DeclarativeBase
+
+
+# Увеличивается при изменении формата, записи старого формата считаются промахом.
+CACHE_FORMAT_VERSION = b'1'
+TABLE_KEY = '__table__'
+
+
+class CacheFormatError(ValueError):
+    """
+    Запись кэша записана в другом формате.
+    """
+
+
+def _compact(value: Any) -> Any:
+    """
+    Приводит значение к структуре для компактной сериализации.
+
+    Модели pydantic и ORM-объекты заменяются словарями значений столбцов,
+    списки словарей с одинаковыми ключами и скалярными значениями — таблицей
+    `{TABLE_KEY: [ключи, строки]}`, чтобы не повторять ключи в каждом элементе.
+
+    Parameters
+    ----------
+    value : Any
+        Исходное значение.
+
+    Returns
+    -------
+    Any
+        Значение, которое сериализуется orjson.
+    """
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    elif isinstance(value, DeclarativeBase):
+        value = {
+            attribute.key: getattr(value, attribute.key)
+            for attribute in inspect(value).mapper.column_attrs
+        }
+
+    if isinstance(value, dict):
+        return {key: _compact(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        items = [_compact(item) for item in value]
+        if items and all(isinstance(item, dict) for item in items):
+            columns = list(items[0])
+            rows = [list(item.values()) for item in items]
+            if all(list(item) == columns for item in items) and not any(
+                isinstance(cell, (dict, list)) for row in rows for cell in row
+            ):
+                return {TABLE_KEY: [columns, rows]}
+        return items
+
+    return value
+
+
+def _expand(value: Any) -> Any:
+    """
+    Восстанавливает списки словарей из таблиц `_compact`.
+
+    Parameters
+    ----------
+    value : Any
+        Десериализованное значение.
+
+    Returns
+    -------
+    Any
+        Значение со списками словарей вместо таблиц.
+    """
+    if isinstance(value, dict):
+        table = value.get(TABLE_KEY)
+        if table is not None:
+            columns, rows = table
+            return [dict(zip(columns, row)) for row in rows]
+        return {key: _expand(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+
+    return value
+
+
+class CompactCoder(Coder):
+    """
+    Кодировщик значений кэша в компактный JSON с версией формата.
+
+    Значения сериализуются orjson: даты — строками ISO 8601, которые FastAPI
+    разбирает при валидации ответа, списки однотипных объектов — таблицами
+    без повторяющихся ключей. Значение предваряется версией формата
+    `<версия>|`.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        return CACHE_FORMAT_VERSION + b'|' + orjson.dumps(_compact(value))
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        version, _, payload = value.partition(b'|')
+        if version != CACHE_FORMAT_VERSION:
+            raise CacheFormatError(f'Unsupported cache format {version[:8]!r}.')
+
+        return _expand(orjson.loads(payload))
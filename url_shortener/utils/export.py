@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from url_shortener.db import read_session
+from url_shortener.config import EXPORT_BATCH_SIZE
+
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def _stream_rows(query: Select, export_format: str, primary: bool) -> AsyncIterator[str]:
+    """
+    Построчно выгружает результат запроса через серверный курсор.
+
+    Parameters
+    ----------
+    query : Select
+        Запрос выгружаемых колонок.
+    export_format : str
+        Формат выгрузки: 'ndjson' или 'csv'.
+    primary : bool
+        Читать с основного сервера вместо реплики.
+
+    Returns
+    -------
+    AsyncIterator[str]
+        Строки выгрузки.
+    """
+    columns = [column.name for column in query.selected_columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if export_format == 'csv':
+        writer.writerow(columns)
+
+    async with read_session(primary=primary) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            for row in partition:
+                if export_format == 'csv':
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_default) + '\n')
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def export_response(
+    query: Select,
+    export_format: str,
+    filename: str,
+    primary: bool = False
+) -> StreamingResponse:
+    """
+    Создает потоковый ответ с выгрузкой результата запроса.
+
+    Память, занимаемая выгрузкой, не зависит от количества строк: строки
+    читаются из базы данных и отправляются клиенту пачками.
+
+    Parameters
+    ----------
+    query : Select
+        Запрос выгружаемых колонок.
+    export_format : str
+        Формат выгрузки: 'ndjson' или 'csv'.
+    filename : str
+        Имя файла выгрузки без расширения.
+    primary : bool, optional
+        Читать с основного сервера вместо реплики, по умолчанию False.
+
+    Returns
+    -------
+    StreamingResponse
+        Потоковый ответ с выгрузкой.
+    """
+    return StreamingResponse(
+        _stream_rows(query, export_format, primary),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'
+        }
+    )
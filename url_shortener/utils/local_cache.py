@@ -0,0 +1,121 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+MISSING = object()
+
+
+class LocalCache:
+    """
+    Ограниченный LRU-кэш с временем жизни записей в памяти процесса.
+
+    Размер кэша ограничивается как количеством записей, так и их суммарным
+    объемом в байтах. Отсутствующие значения кэшируются как `None` с отдельным
+    временем жизни (негативное кэширование).
+
+    Parameters
+    ----------
+    max_entries : int
+        Максимальное количество записей.
+    max_bytes : int
+        Максимальный суммарный объем записей в байтах.
+    ttl : float
+        Время жизни записи в секундах.
+    negative_ttl : float
+        Время жизни негативной записи в секундах.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        negative_ttl: float
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """
+        Возвращает значение из кэша.
+
+        Parameters
+        ----------
+        key : str
+            Ключ записи.
+
+        Returns
+        -------
+        Any
+            Значение записи, `None` для негативной записи или `MISSING`,
+            если запись отсутствует или устарела.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self.invalidate(key)
+            return MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Сохраняет значение в кэше, вытесняя давно не использованные записи.
+
+        Parameters
+        ----------
+        key : str
+            Ключ записи.
+        value : Any
+            Значение записи, `None` сохраняется как негативная запись.
+        ttl : Optional[float], optional
+            Время жизни записи в секундах, по умолчанию берется из настроек кэша.
+        """
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+
+        self.invalidate(key)
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def invalidate(self, key: str) -> None:
+        """
+        Удаляет запись из кэша.
+
+        Parameters
+        ----------
+        key : str
+            Ключ записи.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи из кэша.
+        """
+        self._entries.clear()
+        self._bytes = 0
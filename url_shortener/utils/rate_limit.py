@@ -0,0 +1,187 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+from fastapi_cache import FastAPICache
+from url_shortener.config import (
+    CACHE_PREFIX,
+    RATE_LIMIT_LEASE_SIZE,
+    RATE_LIMIT_MAX_KEYS
+)
+from .local_cache import LocalCache, MISSING
+
+
+logger = logging.getLogger(__name__)
+
+# GCRA: в ключе хранится теоретическое время прибытия (TAT) следующего запроса.
+# Скрипт пытается выдать `lease` токенов, а если их не хватает — один токен.
+# Возвращает количество выданных токенов и, при отказе, время ожидания в мс.
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+
+for _, cost in ipairs({lease, 1}) do
+    local new_tat = tat + emission * cost
+    if new_tat - tolerance <= now then
+        redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+        return {cost, 0}
+    end
+end
+
+return {0, math.ceil(tat + emission - tolerance - now)}
+"""
+
+
+# Процессу выдается не больше 1/LEASE_DIVISOR допустимого всплеска, чтобы
+# токены, взятые одним процессом, не исчерпывали ограничение для остальных.
+LEASE_DIVISOR = 10
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Ограничение частоты запросов: `rate` запросов за `period` секунд.
+
+    Допускается всплеск до `rate` запросов подряд, после чего запросы
+    пропускаются равномерно раз в `period / rate` секунд.
+    """
+
+    rate: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> Optional['RateLimit']:
+        """
+        Разбирает ограничение из строки вида `<запросов>/<секунд>`.
+
+        Parameters
+        ----------
+        value : str
+            Строка ограничения, пустая строка отключает ограничение.
+
+        Returns
+        -------
+        Optional[RateLimit]
+            Ограничение или None.
+        """
+        if not value:
+            return None
+
+        rate, _, period = value.partition('/')
+        return cls(rate=int(rate), period=float(period or 1))
+
+    @property
+    def emission_ms(self) -> float:
+        return self.period * 1000 / self.rate
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов на алгоритме GCRA в Redis.
+
+    Каждая проверка в Redis — один атомарный вызов Lua-скрипта. Чтобы
+    не обращаться к Redis на каждый запрос, при достаточном запасе скрипт
+    выдает процессу сразу `lease_size` токенов, которые расходуются локально.
+    Отказы также запоминаются в процессе до истечения времени ожидания.
+    При недоступности Redis запросы пропускаются.
+
+    Parameters
+    ----------
+    lease_size : int
+        Количество токенов, выдаваемых процессу за одно обращение к Redis.
+    max_keys : int
+        Максимальное количество ключей в локальном состоянии процесса.
+    """
+
+    def __init__(self, lease_size: int, max_keys: int):
+        self.lease_size = lease_size
+        self._local = LocalCache(
+            max_entries=max_keys,
+            max_bytes=max_keys * 1024,
+            ttl=1,
+            negative_ttl=1
+        )
+        self._scripts = {}
+
+    def _script(self, redis):
+        script = self._scripts.get(id(redis))
+        if script is None:
+            script = self._scripts[id(redis)] = redis.register_script(GCRA_SCRIPT)
+        return script
+
+    async def hit(self, key: str, limit: RateLimit) -> Optional[float]:
+        """
+        Учитывает запрос по ключу ограничения.
+
+        Parameters
+        ----------
+        key : str
+            Ключ ограничения, например `shorten:ip:127.0.0.1`.
+        limit : RateLimit
+            Ограничение для ключа.
+
+        Returns
+        -------
+        Optional[float]
+            None, если запрос разрешен, иначе время ожидания в секундах.
+        """
+        state = self._local.get(key)
+        if state is not MISSING:
+            tokens, retry_at = state
+            if tokens > 0:
+                state[0] -= 1
+                return None
+            if retry_at > time.monotonic():
+                return retry_at - time.monotonic()
+            self._local.invalidate(key)
+
+        lease = max(min(self.lease_size, limit.rate // LEASE_DIVISOR), 1)
+
+        redis = FastAPICache\
+            .get_backend()\
+            .redis
+        try:
+            granted, retry_ms = await self._script(redis)(
+                keys=[f'{CACHE_PREFIX}:ratelimit:{key}'],
+                args=[limit.emission_ms, limit.period * 1000, lease]
+            )
+        except Exception:
+            logger.warning('Rate limit check failed, allowing request.', exc_info=True)
+            return None
+
+        if granted:
+            if granted > 1:
+                self._local.set(key, [granted - 1, 0.0], ttl=limit.emission_ms * granted / 1000)
+            return None
+
+        retry_after = retry_ms / 1000
+        self._local.set(key, [0, time.monotonic() + retry_after], ttl=retry_after)
+        return retry_after
+
+
+def retry_after_header(seconds: float) -> str:
+    """
+    Форматирует время ожидания для заголовка `Retry-After`.
+
+    Parameters
+    ----------
+    seconds : float
+        Время ожидания в секундах.
+
+    Returns
+    -------
+    str
+        Целое число секунд, не меньше 1.
+    """
+    return str(max(math.ceil(seconds), 1))
+
+
+rate_limiter = RateLimiter(
+    lease_size=RATE_LIMIT_LEASE_SIZE,
+    max_keys=RATE_LIMIT_MAX_KEYS
+)
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import logging
+from collections.abc import Iterable
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_cache import FastAPICache
+from url_shortener.db import async_session
+from url_shortener.config import (
+    URL_CACHE_MAX_ENTRIES,
+    URL_CACHE_MAX_BYTES,
+    URL_CACHE_TTL,
+    URL_CACHE_NEGATIVE_TTL,
+    URL_INVALIDATION_CHANNEL,
+    URL_INVALIDATION_BATCH_SIZE,
+    ALIAS_FILTER_GENERATION_KEY
+)
+from url_shortener.metrics import span, record_cache
+from .alias_filter import alias_filter
+from .cache_keys import alias_key, VERSION_TTL
+from .local_cache import LocalCache, MISSING
+from .utils import search_url
+
+
+logger = logging.getLogger(__name__)
+
+url_cache = LocalCache(
+    max_entries=URL_CACHE_MAX_ENTRIES,
+    max_bytes=URL_CACHE_MAX_BYTES,
+    ttl=URL_CACHE_TTL,
+    negative_ttl=URL_CACHE_NEGATIVE_TTL
+)
+
+
+class InvalidationPublisher:
+    """
+    Рассылает инвалидации алиасов другим процессам приложения пачками.
+
+    Алиасы накапливаются во множестве, поэтому повторные изменения одного
+    алиаса между отправками сводятся к одному сообщению. Пачка отправляется
+    в канал инвалидации JSON-массивами одним пайплайном Redis.
+
+    Parameters
+    ----------
+    batch_size : int
+        Максимальное количество алиасов в одном сообщении.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self._pending: set[str] = set()
+
+    def publish(self, aliases: Iterable[str]) -> None:
+        """
+        Добавляет алиасы в очередь рассылки.
+
+        Parameters
+        ----------
+        aliases : Iterable[str]
+            Алиасы коротких URL.
+        """
+        self._pending.update(aliases)
+
+    async def flush(self) -> int:
+        """
+        Отправляет накопленные инвалидации.
+
+        Returns
+        -------
+        int
+            Количество отправленных алиасов.
+        """
+        if not self._pending:
+            return 0
+
+        batch, self._pending = list(self._pending), set()
+
+        redis = FastAPICache\
+            .get_backend()\
+            .redis
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for start in range(0, len(batch), self.batch_size):
+                    pipe.publish(
+                        URL_INVALIDATION_CHANNEL,
+                        json.dumps(batch[start:start + self.batch_size])
+                    )
+                await pipe.execute()
+        except Exception:
+            self._pending.update(batch)
+            raise
+
+        return len(batch)
+
+    async def run(self, interval: float) -> None:
+        """
+        Периодически отправляет накопленные инвалидации.
+
+        Parameters
+        ----------
+        interval : float
+            Интервал между отправками в секундах.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Failed to publish URL invalidations.')
+
+
+invalidation_publisher = InvalidationPublisher(batch_size=URL_INVALIDATION_BATCH_SIZE)
+
+
+async def resolve_url(session: Optional[AsyncSession], alias: str) -> Optional[str]:
+    """
+    Возвращает оригинальный URL по алиасу.
+
+    Поиск выполняется последовательно в кэше процесса, в Redis и в базе
+    данных, найденное значение сохраняется в предыдущие уровни кэша.
+    Алиасы, которых точно нет в фильтре алиасов, в базе данных не ищутся,
+    если фильтр получил все рассылки новых алиасов: поколение фильтра
+    читается из Redis вместе с URL. Иначе, в том числе при ошибке Redis,
+    алиас ищется в базе данных.
+
+    Parameters
+    ----------
+    session : Optional[AsyncSession]
+        Асинхронная сессия базы данных. Если не передана, сессия
+        открывается только при промахе кэша.
+    alias : str
+        Алиас короткого URL.
+
+    Returns
+    -------
+    Optional[str]
+        Оригинальный URL или None, если алиас не найден.
+    """
+    url = url_cache.get(alias)
+    if url is not MISSING:
+        record_cache('alias', 'local_hit' if url is not None else 'local_negative_hit')
+        return url
+
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    key = alias_key(alias)
+
+    try:
+        cached, generation = await redis.mget(key, ALIAS_FILTER_GENERATION_KEY)
+        generation = int(generation or 0)
+    except Exception:
+        logger.warning(f"Error retrieving alias '{alias}' from Redis:", exc_info=True)
+        cached = generation = None
+    if cached is not None:
+        record_cache('alias', 'redis_hit')
+        url = cached.decode()
+        url_cache.set(alias, url)
+        return url
+
+    if alias_filter.synced(generation) and not alias_filter.might_exist(alias):
+        record_cache('alias', 'filter_reject')
+        url_cache.set(alias, None)
+        return None
+
+    record_cache('alias', 'miss')
+    with span('alias.query'):
+        if session is None:
+            async with async_session() as session:
+                query_result = await search_url(session=session, alias=alias)
+        else:
+            query_result = await search_url(session=session, alias=alias)
+    if query_result is None:
+        url_cache.set(alias, None)
+        return None
+
+    try:
+        await redis.set(key, query_result.url, ex=60)
+    except Exception:
+        logger.warning(f"Error setting alias '{alias}' in Redis:", exc_info=True)
+    url_cache.set(alias, query_result.url)
+
+    return query_result.url
+
+
+async def register_urls(urls: dict[str, str]) -> None:
+    """
+    Сообщает всем процессам приложения о созданных коротких URL.
+
+    Алиасы добавляются в фильтр алиасов и рассылаются другим процессам,
+    а URL сохраняются в кэш Redis. Ошибки Redis не прерывают запрос:
+    неотправленная рассылка повторяется в фоне, а до ее получения другие
+    процессы видят отставание поколения фильтра и ищут алиасы в базе данных.
+
+    Parameters
+    ----------
+    urls : dict[str, str]
+        Оригинальные URL по алиасам.
+    """
+    if not urls:
+        return
+
+    alias_filter.publish(urls)
+
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for alias, url in urls.items():
+                pipe.set(alias_key(alias), url, ex=60)
+            await pipe.execute()
+    except Exception:
+        logger.warning('Error caching URLs in Redis:', exc_info=True)
+
+    try:
+        await alias_filter.flush()
+    except Exception:
+        logger.warning('Error publishing aliases to the alias filter, will retry:', exc_info=True)
+
+
+async def invalidate_url(
+    alias: str,
+    keys: Iterable[str] = (),
+    versions: Iterable[str] = ()
+) -> None:
+    """
+    Удаляет алиас из всех уровней кэша во всех процессах приложения.
+
+    Parameters
+    ----------
+    alias : str
+        Алиас короткого URL.
+    keys : Iterable[str], optional
+        Дополнительные ключи Redis, зависящие от алиаса.
+    versions : Iterable[str], optional
+        Ключи версий списков Redis, зависящих от алиаса.
+    """
+    await invalidate_urls([alias], keys, versions)
+
+
+async def invalidate_urls(
+    aliases: list[str],
+    keys: Iterable[str] = (),
+    versions: Iterable[str] = ()
+) -> None:
+    """
+    Удаляет алиасы из всех уровней кэша во всех процессах приложения.
+
+    Ключи удаляются одной командой `UNLINK`, версии зависящих списков
+    увеличиваются, все команды Redis отправляются одним пайплайном.
+    Остальным процессам инвалидация рассылается в фоне пачками. При ошибке
+    Redis ключи истекают по своему сроку жизни.
+
+    Parameters
+    ----------
+    aliases : list[str]
+        Алиасы коротких URL.
+    keys : Iterable[str], optional
+        Дополнительные ключи Redis, зависящие от алиасов.
+    versions : Iterable[str], optional
+        Ключи версий списков Redis, зависящих от алиасов.
+    """
+    if not aliases:
+        return
+
+    for alias in aliases:
+        url_cache.invalidate(alias)
+
+    redis = FastAPICache\
+        .get_backend()\
+        .redis
+    with span('cache.invalidate'):
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.unlink(*{alias_key(alias) for alias in aliases}.union(keys))
+                for version in set(versions):
+                    pipe\
+                        .incr(version)\
+                        .expire(version, VERSION_TTL)
+                await pipe.execute()
+        except Exception:
+            logger.warning('Error invalidating URLs in Redis:', exc_info=True)
+
+    invalidation_publisher.publish(aliases)
+
+
+async def listen_url_invalidations(redis) -> None:
+    """
+    Подписывается на канал инвалидации и удаляет алиасы из кэша процесса.
+
+    При потере соединения кэш процесса очищается, так как часть сообщений
+    могла быть пропущена.
+
+    Parameters
+    ----------
+    redis : Redis
+        Асинхронный клиент Redis.
+    """
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(URL_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    for alias in json.loads(message['data']):
+                        url_cache.invalidate(alias)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('URL invalidation subscription failed.')
+            url_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.reset()
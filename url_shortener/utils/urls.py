@@ -0,0 +1,74 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Приводит URL к каноническому виду для сравнения.
+
+    Схема и хост приводятся к нижнему регистру, порт по умолчанию для схемы
+    удаляется, пустой путь заменяется на '/', а параметры запроса
+    сортируются. Кодирование параметров и фрагмент не изменяются.
+    URL, который не удается разобрать, например с незакрытой скобкой
+    IPv6-адреса, сравнивается как есть без пробелов по краям.
+
+    Parameters
+    ----------
+    url : str
+        Исходный URL.
+
+    Returns
+    -------
+    str
+        Нормализованный URL.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+
+    userinfo, _, hostport = parts.netloc.rpartition('@')
+    host, port = hostport, None
+    if hostport.startswith('['):
+        host, _, rest = hostport.partition(']')
+        host += ']'
+        if rest.startswith(':'):
+            port = rest[1:]
+    elif ':' in hostport:
+        host, port = hostport.rsplit(':', 1)
+
+    netloc = host.lower()
+    if port and (not port.isdigit() or int(port) != DEFAULT_PORTS.get(scheme)):
+        netloc = f'{netloc}:{port}'
+    if userinfo:
+        netloc = f'{userinfo}@{netloc}'
+
+    query = '&'.join(sorted(
+        param for param in parts.query.split('&') if param
+    ))
+
+    return urlunsplit((scheme, netloc, parts.path or '/', query, parts.fragment))
+
+
+def url_fingerprint(url: str) -> str:
+    """
+    Вычисляет отпечаток нормализованного URL.
+
+    Parameters
+    ----------
+    url : str
+        Исходный URL.
+
+    Returns
+    -------
+    str
+        SHA-256 нормализованного URL в шестнадцатеричном виде (64 символа).
+    """
+    return hashlib\
+        .sha256(normalize_url(url).encode())\
+        .hexdigest()